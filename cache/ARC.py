@@ -4,7 +4,7 @@ from tqdm import tqdm
 import math
 
 class ARCCache:
-    def __init__(self, max_size):
+    def __init__(self, max_size, ghost="exact", ghost_fp_rate=0.01):
         self.max_size = math.ceil(max_size)  # 缓存容量 c
         # T1 和 T2 存储实际数据
         self.T1 = OrderedDict()  # 最近访问但访问次数不多的项（短期 LRU）
@@ -12,6 +12,15 @@ class ARCCache:
         # B1 和 B2 为 ghost 列表，只记录被淘汰项的 key
         self.B1 = OrderedDict()
         self.B2 = OrderedDict()
+        # ghost="bloom"：用轮转 Bloom filter 代替 key 列表，只保留近似成员关系和近似长度
+        if ghost == "bloom":
+            from cache.ghost_filter import BloomGhostList
+            self.B1 = BloomGhostList(self.max_size, ghost_fp_rate)
+            self.B2 = BloomGhostList(2 * self.max_size, ghost_fp_rate)
+        # 被 remove() 取出、正在被请求使用的 key（释放时 put 视为一次 T1/T2 命中）
+        self.in_use = {}
+        # 可选回调 on_evict(key, value)：T1/T2 中每个被淘汰的 key 都会通知
+        self.on_evict = None
         # 动态平衡参数 p
         self.p = 0
         
@@ -60,20 +69,17 @@ class ARCCache:
             self.T2.move_to_end(key, last=True)
             return
 
-        # 如果 key 在 ghost 列表中
-        if key in self.B1:
-            # print('hit B1')
-            # 根据 ARC 算法调整 p
-            delta = max(1, len(self.B2) // max(1, len(self.B1)))
-            self.p = min(self.p + delta, self.max_size)
+        # 被 remove() 取出的 key：和命中 T1/T2 一样提升到 T2 的 MRU
+        if key in self.in_use:
+            del self.in_use[key]
             if len(self.T1) + len(self.T2) >= self.max_size:
                 self._replace(key)
-            del self.B1[key]
-            # if len(self.T1) + len(self.T2) >= self.max_size:
-            #     self._replace(key)
             self.T2[key] = value
             return
 
+        # 如果 key 在 ghost 列表中（先查 B2：Bloom ghost 删除后 key 仍留在 B1 里，
+        # 一个从 B1 提升、之后被淘汰到 B2 的 key 会同时命中两者，此时以 B2 为准；
+        # 精确 ghost 列表中 B1/B2 互斥，顺序不影响结果）
         if key in self.B2:
             # print('hit B2')
             delta = max(1, len(self.B1) // max(1, len(self.B2)))
@@ -86,6 +92,19 @@ class ARCCache:
             self.T2[key] = value
             return
 
+        if key in self.B1:
+            # print('hit B1')
+            # 根据 ARC 算法调整 p
+            delta = max(1, len(self.B2) // max(1, len(self.B1)))
+            self.p = min(self.p + delta, self.max_size)
+            if len(self.T1) + len(self.T2) >= self.max_size:
+                self._replace(key)
+            del self.B1[key]
+            # if len(self.T1) + len(self.T2) >= self.max_size:
+            #     self._replace(key)
+            self.T2[key] = value
+            return
+
         # 新 key  有点不一样
         # if len(self.T1) + len(self.T2) < self.max_size:
         #     self.T1[key] = value
@@ -95,22 +114,29 @@ class ARCCache:
         # self._prune_ghosts()
         
         # 新 key 插入：严格按照 ARC 伪代码的 Case IV 实现
+        # 只有 T1+T2 已满时才 _replace：单独运行时目录 >= c 意味着缓存已满（ARC 的不变式），
+        # 但 evict()/discard() 由外部调用时会留下 ghost 而缓存未满，此时不应再淘汰常驻块
         L1_size = len(self.T1) + len(self.B1)
+        full = len(self.T1) + len(self.T2) >= self.max_size
         if L1_size == self.max_size:
             if len(self.T1) < self.max_size:
                 if self.B1:
                     poped_content_hash = self.B1.popitem(last=False)[0]  # 删除 B1 的 LRU
                     # print('B miss, popleft(), hash:', poped_content_hash, 'key', key)
-                    self._replace(key)
+                    if full:
+                        self._replace(key)
             else:
                 if self.T1:     # T1占满
-                    self.T1.popitem(last=False)  # 删除 T1 的 LRU
+                    old_key, old_value = self.T1.popitem(last=False)  # 删除 T1 的 LRU
+                    if self.on_evict is not None:
+                        self.on_evict(old_key, old_value)
         elif L1_size < self.max_size:
             total_size = len(self.T1) + len(self.T2) + len(self.B1) + len(self.B2)
             if total_size >= self.max_size:
                 if total_size == 2 * self.max_size and self.B2:
                     self.B2.popitem(last=False)[0]  # 删除 B2 的 LRU
-                self._replace(key)
+                if full:
+                    self._replace(key)
         # 插入新 key 到 T1 的 MRU 位置
         self.T1[key] = value
         # self._prune_ghosts()
@@ -127,12 +153,16 @@ class ARCCache:
         """
         if self.T1 and ((key in self.B2 and len(self.T1) == self.p) or (len(self.T1) > self.p)):
             # assert (key in self.B2 and len(self.T1) == self.p) == False
-            old_key, _ = self.T1.popitem(last=False)
+            old_key, old_value = self.T1.popitem(last=False)
             self.B1[old_key] = None
         elif self.T2:
             # print('remove T2')
-            old_key, _ = self.T2.popitem(last=False)
+            old_key, old_value = self.T2.popitem(last=False)
             self.B2[old_key] = None
+        else:
+            return
+        if self.on_evict is not None:
+            self.on_evict(old_key, old_value)
 
     def _prune_ghosts(self):
         """ 保证 ghost 列表 B1 和 B2 的大小不超过 max_size """
@@ -145,6 +175,52 @@ class ARCCache:
             contant_hash = self.B2.popitem(last=False)[0]
             # print("B1 pop", contant_hash)
 
+    def __len__(self):
+        return len(self.T1) + len(self.T2)
+
+    def __contains__(self, key):
+        return key in self.T1 or key in self.T2
+
+    def remove(self, key):
+        """
+        Take a block out of the evictable set while a request uses it (vLLM's
+        evictor.remove). The next put(key) promotes it to T2 as a re-reference.
+        """
+        if key in self.T1:
+            del self.T1[key]
+        elif key in self.T2:
+            del self.T2[key]
+        else:
+            return
+        self.in_use[key] = None
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        self.remove(key)
+        self.in_use.pop(key, None)
+
+    def evict(self):
+        """
+        Evict one block on behalf of the caller (REPLACE without a requested key),
+        returns its key (None if empty). Keeps |T1|+|B1| <= c and the whole
+        directory <= 2c.
+        """
+        if self.T1 and (len(self.T1) > self.p or not self.T2):
+            old_key, old_value = self.T1.popitem(last=False)
+            self.B1[old_key] = None
+        elif self.T2:
+            old_key, old_value = self.T2.popitem(last=False)
+            self.B2[old_key] = None
+        else:
+            return None
+        if self.on_evict is not None:
+            self.on_evict(old_key, old_value)
+        if len(self.T1) + len(self.B1) > self.max_size:
+            self.B1.popitem(last=False)
+        while len(self.T1) + len(self.T2) + len(self.B1) + len(self.B2) > 2 * self.max_size and self.B2:
+            self.B2.popitem(last=False)
+        return old_key
+
     def _get_cache_size(self):
         return len(self.T1) + len(self.T2)
     
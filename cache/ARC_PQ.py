@@ -124,6 +124,17 @@ class ARCCachePQ:
             assert False
             self.B2.popleft()
 
+    def __getstate__(self):
+        # itertools.count is not picklable on newer Pythons, store its next value instead
+        state = self.__dict__.copy()
+        state["time"] = next(self.time)
+        self.time = itertools.count(state["time"])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.time = itertools.count(state["time"])
+
     def hit_rate(self):
         return self.hit_count / self.access_count if self.access_count > 0 else 0.0
 
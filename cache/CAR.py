@@ -0,0 +1,154 @@
+from collections import OrderedDict, deque
+import math
+import numpy as np
+from tqdm import tqdm
+
+class CARCache:
+    """
+    CAR (Clock with Adaptive Replacement): ARC's T1/T2/B1/B2 and target p,
+    but T1 and T2 are clocks. A hit only sets the block's reference bit; the
+    replacement hand clears bits and moves referenced T1 blocks to T2, so all
+    reordering happens at eviction time.
+
+    Each clock is a deque whose left end is under the hand: advancing the
+    hand is popleft + append, O(1). B1 and B2 are LRU ghost lists as in ARC.
+    As in ARCCache, get() only counts hits and put() is the reference.
+    """
+    def __init__(self, max_size):
+        self.max_size = math.ceil(max_size)
+        self.T1 = deque()
+        self.T2 = deque()
+        self.B1 = OrderedDict()
+        self.B2 = OrderedDict()
+        self.cache = {}         # resident key -> value
+        self.ref = {}           # resident key -> reference bit
+        self.p = 0
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.cache:
+            self.hit_count += 1
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.cache:
+            self.cache[key] = value
+            self.ref[key] = True
+            return
+
+        c = self.max_size
+        in_B1, in_B2 = key in self.B1, key in self.B2
+        if len(self.cache) >= c:
+            self._replace()
+            # history replacement, keeps |T1| + |B1| <= c and the total <= 2c
+            if not in_B1 and not in_B2:
+                if len(self.T1) + len(self.B1) >= c:
+                    if self.B1:
+                        self.B1.popitem(last=False)
+                elif len(self.cache) + len(self.B1) + len(self.B2) >= 2 * c and self.B2:
+                    self.B2.popitem(last=False)
+
+        if in_B1:
+            self.p = min(self.p + max(1, len(self.B2) / len(self.B1)), c)
+            del self.B1[key]
+            self.T2.append(key)
+        elif in_B2:
+            self.p = max(self.p - max(1, len(self.B1) / len(self.B2)), 0)
+            del self.B2[key]
+            self.T2.append(key)
+        else:
+            self.T1.append(key)
+        self.cache[key] = value
+        self.ref[key] = False
+
+    def evict(self):
+        """
+        Evict one block on behalf of the caller, returns its key (None if
+        empty). Without the history replacement of a put() the ghost lists
+        would grow without bound, so this keeps |T1| + |B1| <= c and the
+        whole directory <= 2c.
+        """
+        key = self._replace()
+        if len(self.T1) + len(self.B1) > self.max_size and self.B1:
+            self.B1.popitem(last=False)
+        while len(self.cache) + len(self.B1) + len(self.B2) > 2 * self.max_size and self.B2:
+            self.B2.popitem(last=False)
+        return key
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction; it leaves no ghost """
+        if key not in self.cache:
+            return
+        del self.cache[key], self.ref[key]
+        (self.T1 if key in self.T1 else self.T2).remove(key)    # O(clock size), only for discards
+
+    def _replace(self):
+        """ Run the replacement hand until a block is evicted, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        while True:
+            if self.T1 and (len(self.T1) >= max(1, self.p) or not self.T2):
+                key = self.T1.popleft()
+                if self.ref[key]:
+                    self.ref[key] = False
+                    self.T2.append(key)
+                    continue
+                self.B1[key] = None
+            else:
+                key = self.T2.popleft()
+                if self.ref[key]:
+                    self.ref[key] = False
+                    self.T2.append(key)
+                    continue
+                self.B2[key] = None
+            del self.ref[key]
+            value = self.cache.pop(key)
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+            return key
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = CARCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
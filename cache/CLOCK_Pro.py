@@ -0,0 +1,218 @@
+from collections import deque
+import math
+import numpy as np
+from tqdm import tqdm
+
+class CLOCKProCache:
+    """
+    CLOCK-Pro: one clock holding hot and cold resident blocks plus
+    non-resident cold blocks still in their test period. A hit only sets the
+    reference bit; three hands do the rest at miss time.
+
+    - hand_cold evicts the first unreferenced resident cold block; a
+      referenced one starts a test period, or turns hot if it already was in
+      one (re-used within the test period = small reuse distance)
+    - hand_hot demotes unreferenced hot blocks to cold while there are more
+      than max_size - cold_target hot blocks, and ends test periods it passes
+    - hand_test ends test periods so that at most max_size non-resident
+      blocks are remembered
+
+    cold_target adapts like ARC's p: +1 when a block is re-used within its
+    test period, -1 when a test period ends without re-use. The clock is a
+    circular doubly linked list in two dicts (next / prev); new blocks go
+    right behind hand_hot, i.e. at the head. Resident cold blocks are also
+    queued in the order they turned cold, and hand_cold walks that queue
+    instead of the whole clock, so it never steps over hot blocks. As in
+    ARCCache, get() only counts hits and put() is the reference.
+    """
+    def __init__(self, max_size, cold_ratio=0.01):
+        self.max_size = math.ceil(max_size)
+        self.cold_target = max(1, int(self.max_size * cold_ratio))
+        self.cache = {}         # resident key -> value
+        self.ref = {}           # resident key -> reference bit
+        self.hot = set()
+        self.test = set()       # cold blocks (resident or not) in their test period
+        self.cold = deque()     # resident cold blocks, hand_cold at the left end
+        self.next = {}
+        self.prev = {}
+        self.hand_hot = None
+        self.hand_test = None
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.cache:
+            self.hit_count += 1
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.cache:
+            self.cache[key] = value
+            self.ref[key] = True
+            return
+
+        if len(self.cache) >= self.max_size:
+            self.evict()
+
+        if key in self.next:
+            # non-resident block re-used within its test period
+            self.cold_target = min(self.cold_target + 1, self.max_size - 1)
+            self.test.discard(key)
+            self._unlink(key)
+            self.hot.add(key)
+        elif len(self.hot) < self.max_size - self.cold_target:
+            self.hot.add(key)   # warm-up: hot until the hot share is full
+        else:
+            self.test.add(key)
+            self.cold.append(key)
+        self.cache[key] = value
+        self.ref[key] = False
+        self._link(key)
+
+        self._run_hand_hot()
+        self._run_hand_test()
+
+    def _link(self, key):
+        """ Insert at the head, i.e. right behind hand_hot """
+        if self.hand_hot is None:
+            self.next[key] = self.prev[key] = key
+            self.hand_hot = self.hand_test = key
+            return
+        after = self.hand_hot
+        before = self.prev[after]
+        self.next[before] = key
+        self.prev[key] = before
+        self.next[key] = after
+        self.prev[after] = key
+
+    def _unlink(self, key):
+        after = self.next.pop(key)
+        before = self.prev.pop(key)
+        if after == key:
+            self.hand_hot = self.hand_test = None
+            return
+        self.next[before] = after
+        self.prev[after] = before
+        if self.hand_hot == key:
+            self.hand_hot = after
+        if self.hand_test == key:
+            self.hand_test = after
+
+    def _end_test(self, key):
+        """ Test period over without re-use: forget the block if it is not resident """
+        self.test.discard(key)
+        self.cold_target = max(self.cold_target - 1, 1)
+        if key not in self.cache:
+            self._unlink(key)
+            return True
+        return False
+
+    def evict(self):
+        """ Run hand_cold until a resident cold block is evicted, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        while True:
+            if not self.cold:
+                self._run_hand_hot(force=True)
+            key = self.cold.popleft()
+            if self.ref[key]:
+                self.ref[key] = False
+                if key in self.test:
+                    self.cold_target = min(self.cold_target + 1, self.max_size - 1)
+                    self.test.discard(key)
+                    self.hot.add(key)
+                else:
+                    self.test.add(key)
+                    self.cold.append(key)
+                self._unlink(key)   # back to the head of the clock
+                self._link(key)
+                continue
+
+            value = self.cache.pop(key)
+            del self.ref[key]
+            if key not in self.test:
+                self._unlink(key)   # test blocks stay as non-resident
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+            return key
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction; it leaves no test entry """
+        if key not in self.cache:
+            return
+        del self.cache[key], self.ref[key]
+        if key in self.hot:
+            self.hot.discard(key)
+        else:
+            self.cold.remove(key)   # O(len(cold)), only for discards
+        self.test.discard(key)
+        self._unlink(key)
+
+    def _run_hand_hot(self, force=False):
+        """ Demote hot blocks until the hot share fits (or one block, if forced) """
+        while self.hot and (force or len(self.hot) > self.max_size - self.cold_target):
+            key = self.hand_hot
+            if key in self.hot:
+                if self.ref[key]:
+                    self.ref[key] = False
+                else:
+                    self.hot.discard(key)
+                    self.cold.append(key)
+                    force = False
+                self.hand_hot = self.next[key]
+            elif key in self.test and self._end_test(key):
+                continue            # unlinked, hand_hot already moved on
+            else:
+                self.hand_hot = self.next[key]
+
+    def _run_hand_test(self):
+        while len(self.next) - len(self.cache) > self.max_size:
+            key = self.hand_test
+            if key in self.test and self._end_test(key):
+                continue
+            self.hand_test = self.next[key]
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = CLOCKProCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
@@ -17,6 +17,9 @@ class DBLCachePQ:
 
         self.time = itertools.count()  # global timestamp generator
 
+        self.in_use = set()     # keys taken out by remove(), promoted to Am on put
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+
         self.hit_count = 0
         self.access_count = 0
 
@@ -49,6 +52,16 @@ class DBLCachePQ:
             heapq.heappush(self.Am_heap, (timestamp, key))
             return
 
+        if key in self.in_use:
+            # released after remove(): a re-reference, same as a hit in A1in/Am
+            self.in_use.discard(key)
+            if len(self.A1in_data) + len(self.Am_data) >= self.max_size:
+                self._evict_from_Am()
+            timestamp = next(self.time)
+            self.Am_data[key] = (timestamp, value)
+            heapq.heappush(self.Am_heap, (timestamp, key))
+            return
+
         # insert new key
         assert len(self.A1in_data) <= self.k
         if len(self.A1in_data) == self.k:
@@ -63,18 +76,63 @@ class DBLCachePQ:
         heapq.heappush(self.A1in_heap, (timestamp, key))
 
     def _evict_from_A1in(self):
-        while self.A1in_heap:
-            timestamp, key = heapq.heappop(self.A1in_heap)
-            if key in self.A1in_data and self.A1in_data[key][0] == timestamp:
-                del self.A1in_data[key]
-                return
+        return self._evict_from(self.A1in_heap, self.A1in_data)
 
     def _evict_from_Am(self):
-        while self.Am_heap:
-            timestamp, key = heapq.heappop(self.Am_heap)
-            if key in self.Am_data and self.Am_data[key][0] == timestamp:
-                del self.Am_data[key]
-                return
+        return self._evict_from(self.Am_heap, self.Am_data)
+
+    def _evict_from(self, heap, data):
+        while heap:
+            timestamp, key = heapq.heappop(heap)
+            if key in data and data[key][0] == timestamp:
+                value = data.pop(key)[1]
+                if self.on_evict is not None:
+                    self.on_evict(key, value)
+                return key
+
+    def __len__(self):
+        return len(self.A1in_data) + len(self.Am_data)
+
+    def __contains__(self, key):
+        return key in self.A1in_data or key in self.Am_data
+
+    def remove(self, key):
+        """
+        Take a block out of the evictable set while a request uses it (vLLM's
+        evictor.remove); its heap entry goes stale. The next put(key) promotes
+        it to Am as a re-reference.
+        """
+        if key in self.A1in_data:
+            del self.A1in_data[key]
+        elif key in self.Am_data:
+            del self.Am_data[key]
+        else:
+            return
+        self.in_use.add(key)
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        self.remove(key)
+        self.in_use.discard(key)
+
+    def evict(self):
+        """ Evict one block on behalf of the caller, returns its key (None if empty) """
+        if self.A1in_data and (len(self.A1in_data) >= self.k or not self.Am_data):
+            return self._evict_from_A1in()
+        if self.Am_data:
+            return self._evict_from_Am()
+        return None
+
+    def __getstate__(self):
+        # itertools.count is not picklable on newer Pythons, store its next value instead
+        state = self.__dict__.copy()
+        state["time"] = next(self.time)
+        self.time = itertools.count(state["time"])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.time = itertools.count(state["time"])
 
     def hit_rate(self):
         return self.hit_count / self.access_count if self.access_count > 0 else 0.0
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import math
+import numpy as np
+from tqdm import tqdm
+
+class AdaptiveDBLCache:
+    """
+    DBL whose A1in/Am split tunes itself the way ARC tunes p.
+
+    A1in (FIFO, first-time blocks) has a target size `k`; Am is an LRU of
+    re-referenced blocks. Keys evicted from A1in go to the A1out ghost list
+    (as in DBL_ghost.py), keys evicted from Am to Amout.
+
+    - a miss found in A1out means A1in was too small to keep the block until
+      its second reference: k += max(1, |Amout| / |A1out|)
+    - a miss found in Amout means Am was too small: k -= max(1, |A1out| / |Amout|)
+
+    Either way the block goes straight into Am. When the cache is full, a
+    block is evicted from A1in if it holds more than k blocks, otherwise
+    from Am. `k_ratio` only sets the starting point.
+    """
+    def __init__(self, max_size, k_ratio=0.5):
+        self.max_size = math.ceil(max_size)
+        self.k = max(1.0, self.max_size * k_ratio)
+        self.A1in = OrderedDict()
+        self.Am = OrderedDict()
+        self.A1out = OrderedDict()  # ghost keys evicted from A1in
+        self.Amout = OrderedDict()  # ghost keys evicted from Am
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.Am:
+            self.hit_count += 1
+            return self.Am[key]
+        if key in self.A1in:
+            self.hit_count += 1
+            return self.A1in[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.Am:
+            self.Am[key] = value
+            self.Am.move_to_end(key)
+            return
+        if key in self.A1in:
+            del self.A1in[key]
+            self.Am[key] = value
+            return
+
+        if key in self.A1out:
+            delta = max(1.0, len(self.Amout) / len(self.A1out))
+            self.k = min(self.k + delta, self.max_size - 1)
+            del self.A1out[key]
+            self._make_room()
+            self.Am[key] = value
+            return
+        if key in self.Amout:
+            delta = max(1.0, len(self.A1out) / len(self.Amout))
+            self.k = max(self.k - delta, 1.0)
+            del self.Amout[key]
+            self._make_room()
+            self.Am[key] = value
+            return
+
+        self._make_room()
+        self.A1in[key] = value
+
+    def _make_room(self):
+        if len(self.A1in) + len(self.Am) >= self.max_size:
+            self.evict()
+
+    def evict(self):
+        """ Evict one block, returns its key (None if empty) """
+        if self.A1in and (len(self.A1in) > self.k or not self.Am):
+            key, value = self.A1in.popitem(last=False)
+            ghost = self.A1out
+        elif self.Am:
+            key, value = self.Am.popitem(last=False)
+            ghost = self.Amout
+        else:
+            return None
+        ghost[key] = None
+        if len(ghost) > self.max_size:
+            ghost.popitem(last=False)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return key
+
+    def __len__(self):
+        return len(self.A1in) + len(self.Am)
+
+    def __contains__(self, key):
+        return key in self.A1in or key in self.Am
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = AdaptiveDBLCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}, final k {cache.k:.0f}")
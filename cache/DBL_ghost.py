@@ -2,12 +2,15 @@ from collections import OrderedDict, deque
 import numpy as np
 
 class DBLCache:
-    def __init__(self, max_size):
+    def __init__(self, max_size, ghost="exact", ghost_fp_rate=0.01):
         # The only constraint: total length of 2LRU smaller than max_size
         self.k = int(max_size * 0.5)  # size of A1in and A1out
         self.max_size = max_size    # total size of 2Queue
         self.A1in = OrderedDict()
         self.A1out = deque(maxlen=self.k)
+        if ghost == "bloom":        # approximate A1out: rotating Bloom filter, no keys stored
+            from cache.ghost_filter import BloomGhostList
+            self.A1out = BloomGhostList(self.k, ghost_fp_rate)
         self.Am = OrderedDict()     # Long-term Main Queue
         self.hit_count = 0
         self.access_count = 0
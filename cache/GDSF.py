@@ -0,0 +1,218 @@
+import itertools
+import numpy as np
+from tqdm import tqdm
+
+def block_cost(position, fan_out, attention_weight=0.02):
+    """
+    Default recompute cost of a block: a constant part for the projections
+    and MLP, plus attention over the `position` blocks before it, times the
+    number of documents that share the block.
+    """
+    return (1.0 + attention_weight * position) * fan_out
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of [(priority, tick), key] with a key -> index map, so a
+    key's priority can be changed or removed in O(log n) without leaving
+    stale entries behind. Ties go to the smaller (older) tick.
+    """
+    def __init__(self):
+        self.heap = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def push(self, key, priority, tick):
+        if key in self.index:
+            self.update(key, priority, tick)
+            return
+        self.heap.append([(priority, tick), key])
+        self.index[key] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def update(self, key, priority, tick):
+        i = self.index[key]
+        entry = self.heap[i]
+        old, entry[0] = entry[0], (priority, tick)
+        if entry[0] < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def peek(self):
+        (priority, tick), key = self.heap[0]
+        return priority, key
+
+    def pop(self):
+        priority, key = self.peek()
+        self.remove(key)
+        return priority, key
+
+    def remove(self, key):
+        i = self.index.pop(key)
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.index[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self.index[last[1]])
+
+    def _sift_up(self, i):
+        heap, index = self.heap, self.index
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[i] = heap[parent]
+            index[heap[i][1]] = i
+            i = parent
+        heap[i] = entry
+        index[entry[1]] = i
+
+    def _sift_down(self, i):
+        heap, index = self.heap, self.index
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[i] = heap[child]
+            index[heap[i][1]] = i
+            i = child
+        heap[i] = entry
+        index[entry[1]] = i
+
+
+class GDSFCache:
+    """
+    Greedy-Dual-Size-Frequency: every block has priority
+    H = L + frequency * cost / size, the block with the lowest H is evicted
+    and L (the inflation value) rises to its H, so blocks that are not
+    re-referenced age out. All blocks have size 1 here; the cost comes from
+    `cost_fn(position, fan_out)`:
+
+    - position: index of the block in the prompt it was last used by,
+      learned from the driver's call pattern (the gets of one prompt come in
+      prefix order, a get after a put starts a new prompt)
+    - fan_out: number of distinct documents (the value passed to put) that
+      used the block while it was cached
+
+    As in ARCCache, get() only counts hits and put() is the reference.
+    """
+    def __init__(self, max_size, cost_fn=block_cost):
+        self.max_size = max_size
+        self.cost_fn = cost_fn
+        self.cache = {}         # key -> value
+        self.freq = {}
+        self.docs = {}          # key -> set of documents that used the block
+        self.heap = IndexedHeap()
+        self.L = 0.0
+        self.tick = itertools.count()
+
+        self._prompt_pos = {}   # key -> position in the current prompt
+        self._next_pos = 0
+        self._in_put = True
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if self._in_put:
+            self._in_put = False
+            self._prompt_pos = {}
+            self._next_pos = 0
+        self._prompt_pos[key] = self._next_pos
+        self._next_pos += 1
+
+        if key in self.cache:
+            self.hit_count += 1
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        self._in_put = True
+        if key in self.cache:
+            self.cache[key] = value
+            self.freq[key] += 1
+            self.docs[key].add(value)
+        else:
+            if len(self.cache) >= self.max_size:
+                self.evict()
+            self.cache[key] = value
+            self.freq[key] = 1
+            self.docs[key] = {value}
+        cost = self.cost_fn(self._prompt_pos.get(key, 0), len(self.docs[key]))
+        self.heap.push(key, self.L + self.freq[key] * cost, next(self.tick))
+
+    def evict(self):
+        """ Evict the block with the lowest H, returns its key (None if empty) """
+        if not self.heap:
+            return None
+        self.L, key = self.heap.pop()
+        value = self.cache.pop(key)
+        del self.freq[key]
+        del self.docs[key]
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return key
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction; L is unchanged """
+        if key not in self.cache:
+            return
+        self.heap.remove(key)
+        del self.cache[key], self.freq[key], self.docs[key]
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = GDSFCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
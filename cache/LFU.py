@@ -8,6 +8,8 @@ class LFUCache:
         self.data = {}                      # key -> (value, freq)
         self.freq_table = defaultdict(OrderedDict)  # freq -> OrderedDict of keys
         self.min_freq = 0
+        self.in_use = {}                    # removed (pinned) key -> freq
+        self.on_evict = None                # optional callback(key, value) for every evicted block
         self.hit_count = 0
         self.access_count = 0
 
@@ -34,6 +36,16 @@ class LFUCache:
             self.freq_table[new_freq][key] = None
             return
 
+        if key in self.in_use:
+            # released after remove(): keep counting its frequency
+            freq = self.in_use.pop(key) + 1
+            if len(self.data) >= self.max_size:
+                self._evict()
+            self.data[key] = (value, freq)
+            self.freq_table[freq][key] = None
+            self.min_freq = min(self.freq_table)
+            return
+
         if len(self.data) >= self.max_size:
             self._evict()
 
@@ -48,7 +60,46 @@ class LFUCache:
         key, _ = self.freq_table[freq].popitem(last=False)
         if not self.freq_table[freq]:
             del self.freq_table[freq]
-        del self.data[key]
+        value, _ = self.data.pop(key)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def remove(self, key):
+        """
+        Take a block out of the evictable set while a request uses it (vLLM's
+        evictor.remove). Its frequency is kept, and the next put(key) counts as
+        one more reference.
+        """
+        if key not in self.data:
+            return
+        _, freq = self.data.pop(key)
+        self.in_use[key] = freq
+        del self.freq_table[freq][key]
+        if not self.freq_table[freq]:
+            del self.freq_table[freq]
+            if freq == self.min_freq:
+                self.min_freq = min(self.freq_table, default=0)
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        self.remove(key)
+        self.in_use.pop(key, None)
+
+    def evict(self):
+        """ Evict one block on behalf of the caller, returns its key (None if empty) """
+        if not self.data:
+            return None
+        key = next(iter(self.freq_table[self.min_freq]))
+        self._evict()
+        if self.data and self.min_freq not in self.freq_table:
+            self.min_freq = min(self.freq_table)
+        return key
 
     def hit_rate(self):
         return self.hit_count / self.access_count if self.access_count > 0 else 0.0
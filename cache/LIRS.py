@@ -0,0 +1,165 @@
+from collections import OrderedDict
+import numpy as np
+from tqdm import tqdm
+
+class LIRSCache:
+    """
+    LIRS (Low Inter-reference Recency Set). Blocks re-referenced within a
+    short distance are LIR (hot, never evicted directly); the rest are HIR,
+    and only a small share of the cache (`hir_ratio`) holds resident HIR
+    blocks. A long scan therefore only cycles through the HIR share.
+
+    - stack: recency order of LIR blocks, resident HIR blocks and recently
+      evicted (non-resident) HIR blocks; pruned so its bottom is always LIR
+    - queue: resident HIR blocks, the front one is the next victim
+    - a HIR block referenced again while still in the stack has a smaller
+      inter-reference recency than the bottom LIR block, so they swap status
+
+    As in the other policies, get() only counts hits and put() is the
+    reference. Non-resident entries are capped at `nonresident_ratio` x
+    max_size to bound the stack.
+    """
+    def __init__(self, max_size, hir_ratio=0.01, nonresident_ratio=2.0):
+        self.max_size = max_size
+        self.hir_size = max(1, int(max_size * hir_ratio))
+        self.lir_size = max(1, int(max_size) - self.hir_size)
+        self.max_nonresident = int(max_size * nonresident_ratio)
+
+        self.cache = {}                     # resident key -> value
+        self.lir = set()
+        self.stack = OrderedDict()          # key -> None, last item is the top
+        self.queue = OrderedDict()          # resident HIR keys, first item is evicted first
+        self.nonresident = OrderedDict()    # evicted HIR keys still in the stack
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.cache:
+            self.hit_count += 1
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.cache:
+            self.cache[key] = value
+            if key in self.lir:
+                self.stack[key] = None
+                self.stack.move_to_end(key)
+                self._prune()
+            elif key in self.stack:
+                self._make_lir(key)
+            else:
+                self.stack[key] = None
+                self.queue.move_to_end(key)
+            return
+
+        if len(self.cache) >= self.max_size:
+            self.evict()
+        self.cache[key] = value
+        if len(self.lir) < self.lir_size:
+            self.nonresident.pop(key, None)
+            self.lir.add(key)
+            self.stack[key] = None
+            self.stack.move_to_end(key)
+        elif key in self.nonresident:
+            del self.nonresident[key]
+            self._make_lir(key)
+        else:
+            self.stack[key] = None
+            self.queue[key] = None
+            self._trim_nonresident()
+
+    def _make_lir(self, key):
+        """ HIR block re-referenced inside the stack: swap with the bottom LIR block """
+        self.queue.pop(key, None)
+        self.lir.add(key)
+        self.stack.move_to_end(key)
+        self._demote_bottom()
+
+    def _demote_bottom(self):
+        bottom, _ = self.stack.popitem(last=False)
+        self.lir.discard(bottom)
+        self.queue[bottom] = None
+        self._prune()
+
+    def _prune(self):
+        stack = self.stack
+        while stack:
+            bottom = next(iter(stack))
+            if bottom in self.lir:
+                break
+            del stack[bottom]
+            self.nonresident.pop(bottom, None)
+
+    def _trim_nonresident(self):
+        while len(self.nonresident) > self.max_nonresident:
+            key, _ = self.nonresident.popitem(last=False)
+            self.stack.pop(key, None)
+
+    def evict(self):
+        """ Evict the front resident HIR block, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        if not self.queue:
+            self._demote_bottom()
+        key, _ = self.queue.popitem(last=False)
+        value = self.cache.pop(key)
+        if key in self.stack:
+            self.nonresident[key] = None
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return key
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction; it leaves no non-resident entry """
+        if key not in self.cache:
+            return
+        del self.cache[key]
+        self.lir.discard(key)
+        self.queue.pop(key, None)
+        self.stack.pop(key, None)
+        self._prune()
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = LIRSCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
@@ -8,6 +8,7 @@ class LRUCache:
     def __init__(self, max_size):
         self.max_size = max_size
         self.cache = OrderedDict()
+        self.on_evict = None    # optional callback(key, value) for every evicted block
         self.hit_count = 0
         self.access_count = 0
     
@@ -28,7 +29,35 @@ class LRUCache:
         if len(self.cache) > self.max_size:
             # print("evict")
             flag = True
-            self.cache.popitem(last=False)
+            old_key, old_value = self.cache.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def remove(self, key):
+        """
+        Take a block out of the evictable set while a request uses it (vLLM's
+        evictor.remove). The next put(key) re-inserts it as a fresh reference.
+        """
+        self.cache.pop(key, None)
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        self.cache.pop(key, None)
+
+    def evict(self):
+        """ Evict one block on behalf of the caller, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        old_key, old_value = self.cache.popitem(last=False)
+        if self.on_evict is not None:
+            self.on_evict(old_key, old_value)
+        return old_key
 
     def hit_rate(self):
         return self.hit_count / self.access_count if self.access_count > 0 else 0.0
@@ -0,0 +1,172 @@
+from collections import defaultdict, OrderedDict
+import math
+import random
+import numpy as np
+from tqdm import tqdm
+
+class LeCaRCache:
+    """
+    LeCaR: LRU and LFU as two experts over one set of resident blocks.
+
+    Every eviction picks an expert at random by weight and evicts that
+    expert's victim, which is then remembered in the expert's own history
+    (a ghost list, `history_ratio` x max_size keys at most). A miss found in
+    an expert's history means that expert evicted a block that was still
+    needed, so its weight is scaled by exp(-learning_rate * d ** age) (age =
+    requests since the eviction, d = 0.005 ** (1 / max_size)); recent
+    mistakes cost more. The weights are renormalised, so the cache drifts
+    towards whichever expert makes fewer mistakes on the current workload.
+    Weights are kept within [min_weight, 1 - min_weight]: an expert that is
+    never picked never gets blamed either, so without the floor a weight
+    that reached 0 could not recover after the workload changes.
+
+    Shared state: an OrderedDict in recency order for LRU and frequency
+    buckets as in LFUCache. A block coming back from the LFU history gets
+    its old frequency back. As in ARCCache, get() only counts hits and put()
+    is the reference.
+    """
+    def __init__(self, max_size, learning_rate=0.45, history_ratio=1.0, min_weight=0.01, seed=0):
+        self.max_size = math.ceil(max_size)
+        self.learning_rate = learning_rate
+        self.min_weight = min_weight
+        self.discount = 0.005 ** (1 / self.max_size)
+        self.history_size = max(1, int(self.max_size * history_ratio))
+        self.rng = random.Random(seed)
+
+        self.cache = {}                             # key -> value
+        self.recency = OrderedDict()                # LRU order, last item most recent
+        self.freq = {}                              # key -> frequency
+        self.freq_table = defaultdict(OrderedDict)  # freq -> OrderedDict of keys
+        self.min_freq = 0
+
+        self.weights = [0.5, 0.5]                   # LRU, LFU
+        self.history = [OrderedDict(), OrderedDict()]   # key -> (eviction time, freq)
+        self.time = 0
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.cache:
+            self.hit_count += 1
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        self.time += 1
+        if key in self.cache:
+            self.cache[key] = value
+            self.recency.move_to_end(key)
+            self._bump(key, self.freq[key] + 1)
+            return
+
+        freq = 1
+        for expert, history in enumerate(self.history):
+            if key in history:
+                evicted_at, old_freq = history.pop(key)
+                self._penalize(expert, self.discount ** (self.time - evicted_at))
+                freq = old_freq + 1
+                break
+
+        if len(self.cache) >= self.max_size:
+            self.evict()
+        self.cache[key] = value
+        self.recency[key] = None
+        self.freq[key] = freq
+        self.freq_table[freq][key] = None
+        if self.min_freq not in self.freq_table or freq < self.min_freq:
+            self.min_freq = freq
+
+    def _bump(self, key, new_freq):
+        old_freq = self.freq[key]
+        del self.freq_table[old_freq][key]
+        if not self.freq_table[old_freq]:
+            del self.freq_table[old_freq]
+            if old_freq == self.min_freq:
+                self.min_freq = new_freq
+        self.freq[key] = new_freq
+        self.freq_table[new_freq][key] = None
+
+    def _penalize(self, expert, regret):
+        self.weights[expert] *= math.exp(-self.learning_rate * regret)
+        w = self.weights[0] / (self.weights[0] + self.weights[1])
+        w = min(max(w, self.min_weight), 1 - self.min_weight)
+        self.weights = [w, 1 - w]
+
+    def evict(self):
+        """ Evict the victim of a weighted-random expert, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        lru_victim = next(iter(self.recency))
+        lfu_victim = next(iter(self.freq_table[self.min_freq]))
+        expert = 0 if self.rng.random() < self.weights[0] else 1
+        key = lru_victim if expert == 0 else lfu_victim
+
+        value, freq = self._unlink(key)
+        if lru_victim != lfu_victim:    # both would have evicted it: nobody to blame
+            history = self.history[expert]
+            history[key] = (self.time, freq)
+            if len(history) > self.history_size:
+                history.popitem(last=False)
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return key
+
+    def _unlink(self, key):
+        value = self.cache.pop(key)
+        del self.recency[key]
+        freq = self.freq.pop(key)
+        del self.freq_table[freq][key]
+        if not self.freq_table[freq]:
+            del self.freq_table[freq]
+            if freq == self.min_freq and self.freq_table:
+                self.min_freq = min(self.freq_table)
+        return value, freq
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction: no expert is blamed for it """
+        if key in self.cache:
+            self._unlink(key)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = LeCaRCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}, weights LRU {cache.weights[0]:.2f} / LFU {cache.weights[1]:.2f}")
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+import numpy as np
+from tqdm import tqdm
+
+class S3FIFOCache:
+    """
+    S3-FIFO: a small FIFO (S, ~10%) filters one-hit blocks, a main FIFO (M)
+    holds the rest, and a ghost FIFO (G) remembers keys recently evicted
+    from S. A hit only bumps a 2-bit frequency, all reordering happens at
+    eviction time:
+
+    - from S: a block hit at least `move_threshold` times moves to M,
+      otherwise it is evicted and its key goes to G
+    - from M: a block with freq > 0 is reinserted with freq - 1 (FIFO
+      reinsertion), otherwise it is evicted
+    - a missed key found in G is inserted straight into M
+    """
+    def __init__(self, max_size, small_ratio=0.1, move_threshold=1):
+        self.max_size = max_size
+        self.small_size = max(1, int(max_size * small_ratio))
+        self.ghost_size = max(1, max_size - self.small_size)
+        self.move_threshold = move_threshold
+
+        self.small = OrderedDict()
+        self.main = OrderedDict()
+        self.ghost = OrderedDict()  # key -> None
+        self.freq = {}              # key -> 0..3, for blocks in S and M
+
+        self.on_evict = None        # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        freq = self.freq.get(key)
+        self.access_count += 1
+        if freq is None:
+            return None
+        self.hit_count += 1
+        if freq < 3:
+            self.freq[key] = freq + 1
+        return self.small[key] if key in self.small else self.main[key]
+
+    def put(self, key, value):
+        if key in self.freq:
+            if key in self.small:
+                self.small[key] = value
+            else:
+                self.main[key] = value
+            return
+        if len(self.freq) >= self.max_size:
+            self.evict()
+
+        self.freq[key] = 0
+        if key in self.ghost:
+            del self.ghost[key]
+            self.main[key] = value
+        else:
+            self.small[key] = value
+
+    def evict(self):
+        """ Evict one block, returns its key (None if empty) """
+        while self.small or self.main:
+            if self.small and (len(self.small) >= self.small_size or not self.main):
+                key, value = self.small.popitem(last=False)
+                if self.freq[key] >= self.move_threshold:
+                    self.freq[key] = 0
+                    self.main[key] = value
+                    continue
+                self.ghost[key] = None
+                if len(self.ghost) > self.ghost_size:
+                    self.ghost.popitem(last=False)
+            else:
+                key, value = self.main.popitem(last=False)
+                if self.freq[key] > 0:
+                    self.freq[key] -= 1
+                    self.main[key] = value
+                    continue
+            del self.freq[key]
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+            return key
+        return None
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        if self.freq.pop(key, None) is None:
+            return
+        if self.small.pop(key, None) is None:
+            del self.main[key]
+
+    def __len__(self):
+        return len(self.freq)
+
+    def __contains__(self, key):
+        return key in self.freq
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = S3FIFOCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
@@ -0,0 +1,129 @@
+import numpy as np
+from tqdm import tqdm
+
+class SIEVECache:
+    """
+    SIEVE: one FIFO queue plus a visited bit per block. A hit only sets the
+    bit, nothing is reordered. On eviction a hand walks from the oldest block
+    towards the newest, clearing visited bits, and evicts the first unvisited
+    block; the hand stays where it stopped for the next eviction.
+
+    The queue is a doubly linked list kept in two dicts (newer / older), so
+    removing a block under the hand is O(1).
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.cache = {}         # key -> value
+        self.visited = {}       # key -> bool
+        self.newer = {}         # key -> next key towards the head (None at the head)
+        self.older = {}         # key -> next key towards the tail (None at the tail)
+        self.head = None        # newest block
+        self.tail = None        # oldest block
+        self.hand = None        # None: start from the tail
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.cache:
+            self.hit_count += 1
+            self.visited[key] = True
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.cache:
+            self.cache[key] = value
+            return
+        if len(self.cache) >= self.max_size:
+            self.evict()
+
+        self.cache[key] = value
+        self.visited[key] = False
+        self.newer[key] = None
+        self.older[key] = self.head
+        if self.head is not None:
+            self.newer[self.head] = key
+        self.head = key
+        if self.tail is None:
+            self.tail = key
+
+    def evict(self):
+        """ Evict one block, returns its key (None if empty) """
+        if not self.cache:
+            return None
+        hand = self.hand if self.hand is not None else self.tail
+        while self.visited[hand]:
+            self.visited[hand] = False
+            hand = self.newer[hand]
+            if hand is None:
+                hand = self.tail
+        self.hand = self.newer[hand]
+        value = self._unlink(hand)
+        if self.on_evict is not None:
+            self.on_evict(hand, value)
+        return hand
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction """
+        if key not in self.cache:
+            return
+        if self.hand == key:
+            self.hand = self.newer[key]
+        self._unlink(key)
+
+    def _unlink(self, key):
+        newer, older = self.newer.pop(key), self.older.pop(key)
+        if newer is None:
+            self.head = older
+        else:
+            self.older[newer] = older
+        if older is None:
+            self.tail = newer
+        else:
+            self.newer[older] = newer
+        del self.visited[key]
+        return self.cache.pop(key)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = SIEVECache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
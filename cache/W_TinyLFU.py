@@ -0,0 +1,189 @@
+from collections import OrderedDict
+import numpy as np
+from tqdm import tqdm
+
+# byte -> byte // 2, used to age the whole sketch with one bytes.translate
+HALVE = bytes(i >> 1 for i in range(256))
+
+class CountMinSketch:
+    """
+    Frequency estimate with four rows of one-byte counters (capped at 15, as
+    4-bit counters would be). After `sample_size` increments every counter
+    is halved, so old popularity fades out.
+    """
+    def __init__(self, width, sample_size=None):
+        self.width = 1 << max(4, (int(width) - 1).bit_length())   # power of two
+        self.mask = self.width - 1
+        self.table = bytearray(4 * self.width)
+        self.sample_size = sample_size or 10 * self.width
+        self.additions = 0
+
+    def _indexes(self, key):
+        # one multiplicative hash split in two, row i uses h1 + i * h2
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        mask, width = self.mask, self.width
+        return (h1 & mask, width + ((h1 + h2) & mask),
+                2 * width + ((h1 + 2 * h2) & mask), 3 * width + ((h1 + 3 * h2) & mask))
+
+    def estimate(self, key):
+        table = self.table
+        a, b, c, d = self._indexes(key)
+        return min(table[a], table[b], table[c], table[d])
+
+    def increment(self, key):
+        table = self.table
+        indexes = self._indexes(key)
+        a, b, c, d = indexes
+        current = min(table[a], table[b], table[c], table[d])
+        if current < 15:
+            for i in indexes:
+                if table[i] == current:     # conservative update
+                    table[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.table = bytearray(table.translate(HALVE))
+            self.additions //= 2
+
+class WTinyLFUCache:
+    """
+    W-TinyLFU: a small window LRU in front of a segmented main LRU
+    (probation + protected). A block leaving the window only enters the main
+    cache if the sketch says it is more popular than the main cache's victim.
+    """
+    def __init__(self, max_size, window_ratio=0.01, protected_ratio=0.8):
+        self.max_size = int(max_size)
+        self.window_size = max(1, int(self.max_size * window_ratio))
+        if self.max_size > 1:
+            self.window_size = min(self.window_size, self.max_size - 1)
+        self.main_size = max(0, self.max_size - self.window_size)    # 0: a window-only cache
+        self.protected_size = int(self.main_size * protected_ratio)
+
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(self.max_size)
+
+        self.on_evict = None    # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        self.sketch.increment(key)
+        for segment in (self.protected, self.probation, self.window):
+            if key in segment:
+                self.hit_count += 1
+                return segment[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.window:
+            self.window[key] = value
+            self.window.move_to_end(key)
+            return
+        if key in self.protected:
+            self.protected[key] = value
+            self.protected.move_to_end(key)
+            return
+        if key in self.probation:
+            del self.probation[key]
+            self.protected[key] = value
+            if len(self.protected) > self.protected_size:
+                old_key, old_value = self.protected.popitem(last=False)
+                self.probation[old_key] = old_value     # demoted to probation MRU
+            return
+
+        self.window[key] = value
+        if len(self.window) <= self.window_size:
+            return
+        candidate, candidate_value = self.window.popitem(last=False)
+        if self.main_size == 0:
+            self._evicted(candidate, candidate_value)
+            return
+        if len(self.probation) + len(self.protected) < self.main_size:
+            self.probation[candidate] = candidate_value
+            return
+
+        victim_segment = self.probation if self.probation else self.protected
+        victim = next(iter(victim_segment))
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            victim_value = victim_segment.pop(victim)
+            self.probation[candidate] = candidate_value
+            self._evicted(victim, victim_value)
+        else:
+            self._evicted(candidate, candidate_value)
+
+    def evict(self):
+        """
+        Evict one block on behalf of the caller, returns its key (None if
+        empty): one admission round between the window's LRU block and the
+        main cache's victim, as when the window overflows on a put().
+        """
+        victim_segment = self.probation if self.probation else self.protected
+        if not self.window:
+            if not victim_segment:
+                return None
+            victim = next(iter(victim_segment))
+            self._evicted(victim, victim_segment.pop(victim))
+            return victim
+        candidate, candidate_value = self.window.popitem(last=False)
+        if victim_segment:
+            victim = next(iter(victim_segment))
+            if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+                self.probation[candidate] = candidate_value
+                self._evicted(victim, victim_segment.pop(victim))
+                return victim
+        self._evicted(candidate, candidate_value)
+        return candidate
+
+    def discard(self, key):
+        """ Drop a block for good (e.g. it became unreachable), not an eviction; the sketch keeps its counts """
+        for segment in (self.window, self.probation, self.protected):
+            if segment.pop(key, None) is not None:
+                return
+
+    def _evicted(self, key, value):
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def __len__(self):
+        return len(self.window) + len(self.probation) + len(self.protected)
+
+    def __contains__(self, key):
+        return key in self.window or key in self.probation or key in self.protected
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = WTinyLFUCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
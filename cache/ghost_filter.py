@@ -0,0 +1,99 @@
+import math
+import sys
+
+class BloomGhostList:
+    """
+    Approximate ghost list: membership in two rotating Bloom filters instead
+    of storing the keys.
+
+    Keys go into the current generation; once it holds capacity / 2 keys it
+    becomes the previous generation and the old previous one is cleared, so
+    the last capacity / 2 .. capacity evicted keys are remembered, oldest
+    first forgotten. A key is a member if either generation has all of its
+    bits set (false positives at about `fp_rate`, no false negatives within
+    the window).
+
+    Bloom filters cannot delete. `size` is a separate counter of what the
+    owner believes the list holds: +1 per insert, -1 per delete or popitem,
+    capped at `capacity`. It stands in for len() in ARC's delta computation
+    and DBL's bounds. The class mimics the bits of the OrderedDict (ARC's
+    B1/B2) and deque (DBL's A1out) interfaces the policies use.
+
+    Deleting only fixes the count: the key itself stays a member until its
+    generation rotates out (within `capacity` further inserts). The
+    remaining bias: in ARC, a key promoted out of B1 tests positive in B1
+    again. ARCCache checks B2 first, so this only counts when the key is not
+    in B2, e.g. it was discarded from T2 and is requested again. In DBL, a
+    block promoted out of A1out and later evicted from Am can still be
+    readmitted straight to Am as a ghost hit. A counting filter would avoid
+    both but needs several times the memory.
+    """
+    def __init__(self, capacity, fp_rate=0.01):
+        self.capacity = max(1, int(capacity))
+        self.generation_size = max(1, math.ceil(self.capacity / 2))
+        # a lookup checks both generations, so each gets half the error budget
+        num_bits = -self.generation_size * math.log(fp_rate / 2) / math.log(2) ** 2
+        self.num_bits = max(64, 8 * math.ceil(num_bits / 8))
+        self.num_hashes = max(1, round(self.num_bits / self.generation_size * math.log(2)))
+        self.current = bytearray(self.num_bits // 8)
+        self.previous = bytearray(self.num_bits // 8)
+        self.current_inserts = 0
+        self.size = 0
+
+    def _positions(self, key):
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key):
+        if self.current_inserts >= self.generation_size:
+            self.previous, self.current = self.current, self.previous
+            self.current[:] = bytes(len(self.current))
+            self.current_inserts = 0
+        bits = self.current
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.current_inserts += 1
+        self.size = min(self.size + 1, self.capacity)
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        for bits in (self.current, self.previous):
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                return True
+        return False
+
+    def discard(self, key):
+        self.size = max(self.size - 1, 0)
+
+    def __len__(self):
+        return self.size
+
+    def memory_bytes(self):
+        return len(self.current) + len(self.previous)
+
+    # OrderedDict / deque style aliases, so the policies need no other changes
+    def __setitem__(self, key, value):
+        self.add(key)
+
+    def __delitem__(self, key):
+        self.discard(key)
+
+    def append(self, key):
+        self.add(key)
+
+    def remove(self, key):
+        self.discard(key)
+
+    def popitem(self, last=True):
+        """ The oldest keys age out by rotation; only the size count drops here """
+        self.discard(None)
+        return None, None
+
+
+def ghost_memory_bytes(ghost):
+    """ Bytes held by a ghost list: the filters, or the container plus its key objects """
+    if isinstance(ghost, BloomGhostList):
+        return ghost.memory_bytes()
+    return sys.getsizeof(ghost) + sum(sys.getsizeof(key) for key in ghost)
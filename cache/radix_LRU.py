@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import numpy as np
+from tqdm import tqdm
+
+class RadixLRUCache:
+    """
+    Radix-attention style cache: the blocks form a tree along the prompts they
+    came from, and only leaves (blocks with no cached child) are evicted, the
+    least recently used leaf first. A prefix shared by many prompts therefore
+    outlives all of its suffixes.
+
+    The tree is learned from the driver's call pattern: the gets of one prompt
+    come in prefix order, and a get after a put starts a new prompt. Leaves
+    sit in a heap of (last_access, key) with lazy deletion, so eviction is
+    O(log n).
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.data = {}              # key -> (value, last_access)
+        self.parent = {}            # cached key -> parent key (None at the root)
+        self.num_children = {}      # key -> number of cached children
+        self.leaf_heap = []         # (last_access, key), stale entries skipped on pop
+        self.time = itertools.count()
+
+        self._prompt_parent = {}    # parents seen by the gets of the current prompt
+        self._prev_key = None
+        self._in_put = True         # a get after a put starts a new prompt
+
+        self.on_evict = None        # optional callback(key, value) for every evicted block
+        self.hit_count = 0
+        self.access_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if self._in_put:
+            self._in_put = False
+            self._prompt_parent = {}
+            self._prev_key = None
+        # a prompt may repeat a block hash: keep the first edge, a later one
+        # (or a self edge) could close a cycle that no leaf ever breaks
+        if key not in self._prompt_parent:
+            self._prompt_parent[key] = self._prev_key
+        self._prev_key = key
+
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        self.hit_count += 1
+        return entry[0]
+
+    def put(self, key, value):
+        self._in_put = True
+        timestamp = next(self.time)
+        if key in self.data:
+            self.data[key] = (value, timestamp)
+            if not self.num_children.get(key):
+                heapq.heappush(self.leaf_heap, (timestamp, key))
+            return
+
+        if len(self.data) >= self.max_size:
+            self.evict()
+
+        parent = self._prompt_parent.get(key)
+        self.data[key] = (value, timestamp)
+        self.parent[key] = parent
+        if parent is not None:
+            self.num_children[parent] = self.num_children.get(parent, 0) + 1
+        if not self.num_children.get(key):
+            heapq.heappush(self.leaf_heap, (timestamp, key))
+
+    def evict(self):
+        """ Evict the least recently used leaf, returns its key (None if empty) """
+        while self.leaf_heap:
+            timestamp, key = heapq.heappop(self.leaf_heap)
+            entry = self.data.get(key)
+            if entry is None or entry[1] != timestamp or self.num_children.get(key):
+                continue
+            del self.data[key]
+            self.num_children.pop(key, None)
+            parent = self.parent.pop(key)
+            if parent is not None:
+                self.num_children[parent] -= 1
+                if self.num_children[parent] == 0:
+                    del self.num_children[parent]
+                    if parent in self.data:     # the parent just became a leaf
+                        heapq.heappush(self.leaf_heap, (self.data[parent][1], parent))
+            if self.on_evict is not None:
+                self.on_evict(key, entry[0])
+            return key
+        return None
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+def power_law_sampling(num_elements, sequence_length=1000, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
+    data = read_block_data_v3(data_path)[:]
+    selected_inputs = power_law_sampling(len(data))
+    data = selected_inputs
+
+    cache = RadixLRUCache(max_size=600 * 10)
+    for i, row in enumerate(tqdm(data)):
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+    print(f"Hit Rate: {cache.hit_rate():.2%}")
@@ -0,0 +1,49 @@
+import glob
+import os
+import pickle
+
+from result_store import cell_key
+
+
+def snapshot(cache):
+    """ Serialize the full state of a policy (queues, heaps, ghost lists, p, counters) """
+    return pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore(blob):
+    return pickle.loads(blob)
+
+
+def checkpoint_path(directory, params, prompts_done):
+    """
+    `params` identifies the run except for its length (trace, generator, seed,
+    policy, cache size ...), so every prefix of the same run shares one key.
+    """
+    return os.path.join(directory, f"{cell_key(params)}_{prompts_done}.ckpt")
+
+
+def save_checkpoint(directory, params, cache, prompts_done):
+    os.makedirs(directory, exist_ok=True)
+    path = checkpoint_path(directory, params, prompts_done)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(snapshot(cache))
+    os.replace(tmp_path, path)     # never leave a half written checkpoint behind
+    return path
+
+
+def load_checkpoint(directory, params, max_prompts):
+    """
+    Return (cache, prompts_done) for the longest saved prefix of the run that
+    is not longer than `max_prompts`, or (None, 0) if there is none.
+    """
+    prefix = os.path.join(directory, cell_key(params) + "_")
+    best = 0
+    for path in glob.glob(glob.escape(prefix) + "*.ckpt"):
+        prompts_done = int(path[len(prefix):-len(".ckpt")])
+        if best < prompts_done <= max_prompts:
+            best = prompts_done
+    if best == 0:
+        return None, 0
+    with open(checkpoint_path(directory, params, best), "rb") as f:
+        return restore(f.read()), best
@@ -0,0 +1,197 @@
+import argparse
+import bisect
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from simulate import replay
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+# routers whose decision does not depend on cache contents, so every replica
+# can replay its share of the trace on its own
+STATIC_ROUTERS = ("round_robin", "least_loaded", "consistent_hash")
+
+# below this many routed blocks, starting the workers and pickling the shares
+# costs more than replaying them in process
+MIN_PARALLEL_BLOCKS = 200_000
+
+
+class ConsistentHashRing:
+    def __init__(self, num_replicas, virtual_nodes=100):
+        self.ring = sorted(
+            (self._hash(f"{replica}-{v}"), replica)
+            for replica in range(num_replicas) for v in range(virtual_nodes)
+        )
+        self.points = [point for point, _ in self.ring]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), "big")
+
+    def lookup(self, key):
+        i = bisect.bisect(self.points, self._hash(key)) % len(self.points)
+        return self.ring[i][1]
+
+
+class Router:
+    """
+    Picks a replica per prompt.
+
+    - round_robin: replicas in turn
+    - least_loaded: fewest blocks among the last `window` routed prompts
+    - consistent_hash: hash ring on the prompt's first block, so prompts sharing
+      a prefix land on the same replica
+    - prefix: replica with the longest cached prefix of the prompt (ties go to
+      the least loaded one); needs the replicas' caches
+    """
+
+    def __init__(self, policy, num_replicas, window=64, caches=None):
+        self.policy = policy
+        self.num_replicas = num_replicas
+        self.caches = caches
+        self.next = 0
+        self.recent = deque(maxlen=window)
+        self.window_load = [0] * num_replicas
+        self.ring = ConsistentHashRing(num_replicas) if policy == "consistent_hash" else None
+
+    def route(self, row):
+        if self.policy == "round_robin":
+            replica = self.next
+            self.next = (self.next + 1) % self.num_replicas
+        elif self.policy == "least_loaded":
+            replica = min(range(self.num_replicas), key=self.window_load.__getitem__)
+        elif self.policy == "consistent_hash":
+            replica = self.ring.lookup(row[0][0])
+        elif self.policy == "prefix":
+            replica = max(range(self.num_replicas),
+                          key=lambda r: (self._cached_prefix(self.caches[r], row), -self.window_load[r]))
+        else:
+            raise ValueError(f"unknown router {self.policy}")
+
+        if len(self.recent) == self.recent.maxlen:
+            old_replica, old_blocks = self.recent[0]
+            self.window_load[old_replica] -= old_blocks
+        self.recent.append((replica, len(row)))
+        self.window_load[replica] += len(row)
+        return replica
+
+    @staticmethod
+    def _cached_prefix(cache, row):
+        n = 0
+        for key, _ in row:
+            if key not in cache:
+                break
+            n += 1
+        return n
+
+
+def _replay_replica(args):
+    policy, max_size, rows = args
+    cache = POLICIES[policy](max_size=max_size)
+    replay(cache, rows)
+    return cache.hit_count, cache.access_count
+
+
+def simulate_cluster(data, policy, num_replicas, max_size, router="round_robin", workers=None, window=64):
+    """
+    Returns per-replica (hit_count, access_count) and the number of blocks
+    routed to every replica. Static routers replay the replicas in `workers`
+    processes (default: one per replica, up to the core count), or in process
+    for traces below MIN_PARALLEL_BLOCKS blocks unless `workers` is given.
+    """
+    if router in STATIC_ROUTERS:
+        r = Router(router, num_replicas, window)
+        shares = [[] for _ in range(num_replicas)]
+        for row in data:
+            shares[r.route(row)].append(row)
+        jobs = [(policy, max_size, rows) for rows in shares]
+        load = [sum(len(row) for row in rows) for rows in shares]
+        if workers is None:
+            workers = 1 if sum(load) < MIN_PARALLEL_BLOCKS else min(num_replicas, os.cpu_count() or 1)
+        if workers == 1:
+            stats = [_replay_replica(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                stats = list(pool.map(_replay_replica, jobs))
+        return stats, load
+
+    caches = [POLICIES[policy](max_size=max_size) for _ in range(num_replicas)]
+    r = Router(router, num_replicas, window, caches)
+    load = [0] * num_replicas
+    for row in tqdm(data, leave=False):
+        replica = r.route(row)
+        load[replica] += len(row)
+        replay(caches[replica], [row])
+    return [(c.hit_count, c.access_count) for c in caches], load
+
+
+def cluster_report(stats, load):
+    hits = sum(h for h, _ in stats)
+    accesses = sum(a for _, a in stats)
+    mean_load = np.mean(load)
+    return {
+        "aggregate_hit_rate": hits / accesses if accesses else 0.0,
+        "replica_hit_rates": [h / a if a else 0.0 for h, a in stats],
+        "load_imbalance": float(max(load) / mean_load) if mean_load else 0.0,   # max / mean
+        "load_cv": float(np.std(load) / mean_load) if mean_load else 0.0,
+    }
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(num_elements, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-replica cluster simulation with request routing")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of one replica's cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--replicas", type=int, default=4, help="Number of vLLM instances")
+    parser.add_argument("--policy", type=str, default="ARC", choices=list(POLICIES))
+    parser.add_argument("--routers", type=str, nargs="+", default=list(STATIC_ROUTERS) + ["prefix"],
+                        choices=list(STATIC_ROUTERS) + ["prefix"])
+    parser.add_argument("--window", type=int, default=64, help="Recent prompts counted as load by least_loaded")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the static routers (1 = in process; default: in process "
+                        "below MIN_PARALLEL_BLOCKS routed blocks, else one per replica)")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_size = int(668 / args.cache_size_fraction)
+    data = read_block_data_v3(data_path)[:]
+    data = power_law_sampling(len(data), sequence_length=args.sequence_length, exponent=args.alpha)
+
+    for router in args.routers:
+        stats, load = simulate_cluster(data, args.policy, args.replicas, max_size, router,
+                                       args.workers, args.window)
+        report = cluster_report(stats, load)
+        per_replica = " ".join(f"{h:.2%}" for h in report["replica_hit_rates"])
+        print(f"{router}: {args.policy}Cache Hit Rate: {report['aggregate_hit_rate']:.2%} "
+              f"[{per_replica}] load max/mean {report['load_imbalance']:.2f}, cv {report['load_cv']:.2f}")
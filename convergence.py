@@ -0,0 +1,66 @@
+import math
+
+
+class ConvergenceMonitor:
+    """
+    Batch-means steady-state detector for one simulation cell.
+
+    The first `warmup` prompts are excluded. After that, the hit rate of every
+    `window` consecutive prompts is one sample; once at least `min_windows`
+    samples exist and the half width of the `z` confidence interval of their
+    mean is within `tolerance`, the cell is considered converged.
+    """
+
+    def __init__(self, window=50, tolerance=0.005, warmup=100, min_windows=5, z=1.96):
+        self.window = window
+        self.tolerance = tolerance
+        self.warmup = warmup
+        self.min_windows = min_windows
+        self.z = z
+
+        self.prompts = 0
+        self.window_rates = []
+        self._start_hits = 0
+        self._start_accesses = 0
+        self.stop_index = None  # number of prompts replayed when convergence was detected
+
+    def update(self, cache):
+        """ Call after every prompt; returns True once the cell can stop """
+        self.prompts += 1
+        if self.prompts <= self.warmup:
+            self._start_hits, self._start_accesses = cache.hit_count, cache.access_count
+            return False
+        if (self.prompts - self.warmup) % self.window:
+            return False
+
+        accesses = cache.access_count - self._start_accesses
+        hits = cache.hit_count - self._start_hits
+        self.window_rates.append(hits / accesses if accesses else 0.0)
+        self._start_hits, self._start_accesses = cache.hit_count, cache.access_count
+
+        if len(self.window_rates) >= self.min_windows and self.half_width() <= self.tolerance:
+            self.stop_index = self.prompts
+            return True
+        return False
+
+    def estimate(self):
+        """ Steady-state hit rate (mean of the post warm-up window hit rates) """
+        if not self.window_rates:
+            return None
+        return sum(self.window_rates) / len(self.window_rates)
+
+    def half_width(self):
+        n = len(self.window_rates)
+        if n < 2:
+            return math.inf
+        mean = self.estimate()
+        var = sum((r - mean) ** 2 for r in self.window_rates) / (n - 1)
+        return self.z * math.sqrt(var / n)
+
+    def summary(self):
+        return {
+            "converged": self.stop_index is not None,
+            "stop_index": self.stop_index if self.stop_index is not None else self.prompts,
+            "steady_state_hit_rate": self.estimate(),
+            "half_width": self.half_width() if len(self.window_rates) >= 2 else None,
+        }
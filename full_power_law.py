@@ -8,6 +8,11 @@ from cache.ARC import ARCCache
 from cache.DBL import DBLCache
 from cache.DBL_PQ import DBLCachePQ
 from cache.LFU import LFUCache
+from convergence import ConvergenceMonitor
+from checkpoint import load_checkpoint, save_checkpoint
+from kv_capacity import add_capacity_args, capacity_from_args
+from result_store import ResultStore, cache_result, code_fingerprint, trace_fingerprint
+from simulate import replay
 
 def read_block_data_v3(path):
     with open(path, "r") as f:
@@ -37,6 +42,14 @@ if __name__ == "__main__":
     parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
     parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
     parser.add_argument("--sequence_length", type=float, default=800, help="Numbers of prompts")    # 750
+    parser.add_argument("--result_db", type=str, default="./result/results.sqlite", help="Result store; cells already in it are not simulated again")
+    parser.add_argument("--no_result_db", action="store_true", help="Always simulate and do not touch the result store")
+    parser.add_argument("--checkpoint_dir", type=str, default=None, help="Save the final cache state here and resume longer runs from the longest saved prefix")
+    parser.add_argument("--early_stop", action="store_true", help="Stop a cell once its steady-state hit rate is stable")
+    parser.add_argument("--es_window", type=int, default=50, help="Prompts per hit-rate sample for early stopping")
+    parser.add_argument("--es_tolerance", type=float, default=0.005, help="Confidence half width at which a cell stops")
+    parser.add_argument("--es_warmup", type=int, default=100, help="Prompts excluded from the steady-state estimate")
+    add_capacity_args(parser)
     args = parser.parse_args()
 
     alpha = float(args.alpha)
@@ -47,68 +60,83 @@ if __name__ == "__main__":
     data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/142_docs.txt"
     data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
     max_size = int(668 / cache_size_fraction)
+    if args.model is not None:
+        max_size = capacity_from_args(args)
+        cache_size_fraction = round(668 / max_size, 4)
+        print(f"{args.model}: {max_size} KV blocks (cache_size_fraction={cache_size_fraction})")
     # k_value = int(max_size * 0.25)
     
-    data = read_block_data_v3(data_path)[:]
-    selected_inputs = power_law_sampling(len(data),sequence_length=sequence_length, exponent=alpha)
-    data = selected_inputs
+    store = None if args.no_result_db else ResultStore(args.result_db)
+    base_params = {
+        "trace": trace_fingerprint(data_path),
+        "generator": "power_law_sampling",
+        "alpha": alpha,
+        "sequence_length": sequence_length,
+        "seed": 42,
+        "cache_size": max_size,
+    }
 
-    lru_cache = LRUCache(max_size=max_size)
-    for row in data:
-        for key, value in row:
-            lru_cache.get(key)
-        for key, value in reversed(row):
-            lru_cache.put(key, value)
-    print(f"LRUCache Hit Rate: {lru_cache.hit_rate():.2%}")
-    
-    dbl_cache = DBLCachePQ(max_size=max_size)
-    for idx, row in enumerate(data):
-        for key, value in row:
-            dbl_cache.get(key)
-        for key, value in reversed(row):
-            dbl_cache.put(key, value)
-        # print(f"Step {idx} DBLCache A1: {len(dbl_cache.A1in_data)}, Am: {len(dbl_cache.Am_data)}")
-    print(f"DBLCache Hit Rate: {dbl_cache.hit_rate():.2%}")
-    
-    lfu_cache = LFUCache(max_size=max_size)
-    for idx, row in enumerate(data):
-        for key, value in row:
-            lfu_cache.get(key)
-        for key, value in reversed(row):
-            lfu_cache.put(key, value)
-        # print(f"Step {idx} DBLCache A1: {len(lfu_cache.A1in_data)}, Am: {len(lfu_cache.Am_data)}")
-        # print(f"Step {idx} lfu_cache.min_freq {lfu_cache.min_freq}")
-    print(f"LFUCache Hit Rate: {lfu_cache.hit_rate():.2%}")
-    
-    # dbl_cache_pq = DBLCachePQ(max_size=max_size)
-    # for row in data:
-    #     for key, value in row:
-    #         dbl_cache_pq.get(key)
-    #     for key, value in reversed(row):
-    #         dbl_cache_pq.put(key, value)
-    # print(f"DBLCachePQ Hit Rate: {dbl_cache_pq.hit_rate():.2%}")
+    data = None
+    def make_run(policy, cache_cls, **policy_params):
+        def run():
+            global data
+            if data is None:    # only sample the trace when some cell is missing
+                data = read_block_data_v3(data_path)[:]
+                data = power_law_sampling(len(data), sequence_length=sequence_length, exponent=alpha)
+            cache, prompts_done = None, 0
+            if args.checkpoint_dir:
+                # the sampled trace of a shorter run is a prefix of this one, resume from it
+                ckpt_params = {k: v for k, v in base_params.items() if k != "sequence_length"}
+                ckpt_params.update(policy=policy, policy_params=policy_params,
+                                   code=code_fingerprint(cache_cls, replay))
+                cache, prompts_done = load_checkpoint(args.checkpoint_dir, ckpt_params, sequence_length)
+            if cache is None:
+                cache = cache_cls(max_size=max_size, **policy_params)
+            monitor = None
+            if args.early_stop:
+                monitor = ConvergenceMonitor(window=args.es_window, tolerance=args.es_tolerance,
+                                             warmup=args.es_warmup)
+            replay(cache, tqdm(data[prompts_done:], desc=cache_cls.__name__, leave=False), monitor)
+            result = cache_result(cache)
+            if monitor is not None:
+                summary = monitor.summary()
+                summary["stop_index"] += prompts_done
+                result.update(summary)
+                if summary["converged"]:
+                    # report the steady-state estimate the confidence bound refers to
+                    result.update(cumulative_hit_rate=result["hit_rate"],
+                                  hit_rate=summary["steady_state_hit_rate"])
+                    return result
+            if args.checkpoint_dir and prompts_done < sequence_length:
+                save_checkpoint(args.checkpoint_dir, ckpt_params, cache, sequence_length)
+            return result
+        return run
 
-    # two_q_cache = TwoQCache(max_size=max_size, k=k_value)
-    # for row in data:
-    #     for key, value in row:
-    #         two_q_cache.get(key)
-    #     for key, value in reversed(row):
-    #         two_q_cache.put(key, value)
-    # print(f"TwoQCache Hit Rate: {two_q_cache.hit_rate():.2%}")
-    
-    arc_cache = ARCCache(max_size=max_size)
-    for idx, row in enumerate(tqdm(data)):
-        # if row[0][0] in arc_cache.T1 or row[0][0] in arc_cache.T2:
-        #     print('hit')
-        # else:
-        #     print('miss')
-        for key, value in row:
-            arc_cache.get(key)
-        for key, value in reversed(row):
-            arc_cache.put(key, value)
-        # print(f"Step {idx+1} ARCCache T1: {len(arc_cache.T1)}, T2: {len(arc_cache.T2)}, B1: {len(arc_cache.B1)}, B2: {len(arc_cache.B2)}, p: {arc_cache.p}")
-    print(f"ARCCache Hit Rate: {arc_cache.hit_rate():.2%}")
+    policies = [
+        ("LRUCache", "LRU_v2", LRUCache, {}),
+        ("DBLCache", "DBL_PQ", DBLCachePQ, {}),
+        ("LFUCache", "LFU", LFUCache, {}),
+        ("ARCCache", "ARC", ARCCache, {}),
+    ]
+    hit_rates = {}
+    for name, policy, cache_cls, policy_params in policies:
+        params = dict(base_params, policy=policy, policy_params=policy_params,
+                      code=code_fingerprint(cache_cls, replay))
+        if args.early_stop:
+            params["early_stop"] = {"window": args.es_window, "tolerance": args.es_tolerance,
+                                    "warmup": args.es_warmup}
+        run = make_run(policy, cache_cls, **policy_params)
+        if store is None:
+            result, cached = run(), False
+        else:
+            result, cached = store.get_or_run(params, run)
+        hit_rates[name] = result["hit_rate"]
+        print(f"{name} Hit Rate: {result['hit_rate']:.2%}" + (" (cached)" if cached else ""))
+        if result.get("converged"):
+            print(f"    converged after {result['stop_index']} prompts, +/- {result['half_width']:.4f}")
+    if store is not None:
+        store.close()
 
     result_filename = f"./result/full_results_alpha_{alpha}.txt"
     with open(result_filename, "a") as f:
-        f.write(f"{cache_size_fraction},{lru_cache.hit_rate():.4f},{dbl_cache.hit_rate():.4f},{arc_cache.hit_rate():.4f}\n")
\ No newline at end of file
+        f.write(f"{cache_size_fraction},{hit_rates['LRUCache']:.4f},{hit_rates['DBLCache']:.4f},{hit_rates['ARCCache']:.4f}\n")
\ No newline at end of file
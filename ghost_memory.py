@@ -0,0 +1,84 @@
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.ARC import ARCCache
+from cache.DBL_ghost import DBLCache
+from cache.ghost_filter import ghost_memory_bytes
+from simulate import replay
+
+# policy -> (class, names of its ghost lists)
+POLICIES = {
+    "ARC": (ARCCache, ("B1", "B2")),
+    "DBL_ghost": (DBLCache, ("A1out",)),
+}
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(num_elements, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+def ghost_tradeoff(policy, data, max_size, fp_rates):
+    """
+    Replays `data` with exact ghost lists and with Bloom ghost lists at every
+    false-positive rate. Returns rows of (ghost, hit_rate, hit-rate loss in
+    points, ghost bytes, bytes saved) with the exact run first.
+
+    The loss includes more than false positives. A Bloom ghost cannot
+    forget a deleted key before its generation rotates out, so promoted
+    keys can still count as ghost hits (see BloomGhostList).
+    """
+    cls, ghost_names = POLICIES[policy]
+    rows = []
+    exact = cls(max_size=max_size)
+    exact_hit_rate = replay(exact, data)
+    exact_bytes = sum(ghost_memory_bytes(getattr(exact, name)) for name in ghost_names)
+    rows.append(("exact", exact_hit_rate, 0.0, exact_bytes, 0))
+    for fp_rate in fp_rates:
+        cache = cls(max_size=max_size, ghost="bloom", ghost_fp_rate=fp_rate)
+        hit_rate = replay(cache, data)
+        ghost_bytes = sum(ghost_memory_bytes(getattr(cache, name)) for name in ghost_names)
+        rows.append((f"bloom fp={fp_rate}", hit_rate, (exact_hit_rate - hit_rate) * 100,
+                     ghost_bytes, exact_bytes - ghost_bytes))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hit-rate loss vs memory saved by Bloom-filter ghost lists")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=1500, help="Numbers of prompts")
+    parser.add_argument("--fp_rates", type=float, nargs="+", default=[0.1, 0.01, 0.001], help="Bloom filter false-positive rates")
+    parser.add_argument("--policies", type=str, nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_size = int(668 / args.cache_size_fraction)
+    data = read_block_data_v3(data_path)[:]
+    data = power_law_sampling(len(data), sequence_length=args.sequence_length, exponent=args.alpha)
+
+    print("note: Bloom ghosts keep deleted keys until their generation rotates out, so the loss also "
+          "counts stale ghost hits (ARC B1 after promotion, DBL A1out), not only false positives")
+    result_filename = f"./result/ghost_memory_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("cache_size_fraction,policy,ghost,hitrate,hitrate_loss_points,ghost_bytes,bytes_saved\n")
+        for policy in tqdm(args.policies):
+            for ghost, hit_rate, loss, ghost_bytes, saved in ghost_tradeoff(policy, data, max_size, args.fp_rates):
+                print(f"{policy} ({ghost}): Hit Rate {hit_rate:.2%} (loss {loss:+.2f} pts), "
+                      f"ghost memory {ghost_bytes / 1024:.1f} KiB (saved {saved / 1024:.1f} KiB)")
+                f.write(f"{args.cache_size_fraction},{policy},{ghost},{hit_rate:.4f},{loss:.3f},{ghost_bytes},{saved}\n")
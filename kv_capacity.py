@@ -0,0 +1,78 @@
+import argparse
+import math
+
+GiB = 1 << 30
+
+DTYPE_BYTES = {
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "fp8": 1,
+}
+
+# shapes from the models' config.json; num_params is used for the weight footprint,
+# hidden_size (query heads x head_dim) for the attention FLOPs in ttft_model.py
+MODEL_PRESETS = {
+    "Qwen2.5-1.5B-Instruct": dict(num_layers=28, num_kv_heads=2, head_dim=128, hidden_size=1536, num_params=1.54e9, dtype="bfloat16"),
+    "SmolLM2-360M-Instruct": dict(num_layers=32, num_kv_heads=5, head_dim=64, hidden_size=960, num_params=0.362e9, dtype="bfloat16"),
+    "Mistral-7B-Instruct-v0.3": dict(num_layers=32, num_kv_heads=8, head_dim=128, hidden_size=4096, num_params=7.25e9, dtype="bfloat16"),
+}
+
+
+def kv_bytes_per_block(num_layers, num_kv_heads, head_dim, dtype="bfloat16", block_size=16):
+    """ K and V of `block_size` tokens in every layer """
+    return 2 * num_layers * num_kv_heads * head_dim * DTYPE_BYTES[dtype] * block_size
+
+
+def num_kv_blocks(model, gpu_memory_gb, gpu_memory_utilization=0.9, block_size=16,
+                  activation_gb=1.0, kv_cache_dtype=None):
+    """
+    Number of KV blocks vLLM can allocate, i.e. the `max_size` of the simulated cache.
+
+    Mirrors vLLM's profiling: the usable memory is `gpu_memory_gb * gpu_memory_utilization`,
+    minus the weights and the peak activation / non-torch memory (`activation_gb`),
+    and the rest is split into blocks of `block_size` tokens.
+    `model` is a preset name or a dict with the keys of MODEL_PRESETS.
+    """
+    spec = MODEL_PRESETS[model] if isinstance(model, str) else model
+    weight_bytes = spec["num_params"] * DTYPE_BYTES[spec["dtype"]]
+    free_bytes = gpu_memory_gb * GiB * gpu_memory_utilization - weight_bytes - activation_gb * GiB
+    block_bytes = kv_bytes_per_block(spec["num_layers"], spec["num_kv_heads"], spec["head_dim"],
+                                     kv_cache_dtype or spec["dtype"], block_size)
+    return max(0, math.floor(free_bytes / block_bytes))
+
+
+def add_capacity_args(parser):
+    """ Shared command line options for scripts that size the cache from a model config """
+    parser.add_argument("--model", type=str, default=None, choices=list(MODEL_PRESETS), help="Derive the cache size from this model's KV footprint")
+    parser.add_argument("--gpu_memory_gb", type=float, default=24.0, help="GPU memory in GiB")
+    parser.add_argument("--gpu_memory_utilization", type=float, default=0.9, help="vLLM --gpu-memory-utilization")
+    parser.add_argument("--block_size", type=int, default=16, help="Tokens per KV block")
+    parser.add_argument("--activation_gb", type=float, default=1.0, help="Peak activation and non-torch memory in GiB")
+    parser.add_argument("--kv_cache_dtype", type=str, default=None, choices=list(DTYPE_BYTES), help="KV cache dtype (default: model dtype)")
+
+
+def capacity_from_args(args):
+    """ num_kv_blocks from the add_capacity_args options; raises ValueError if not a single block fits """
+    blocks = num_kv_blocks(args.model, args.gpu_memory_gb, args.gpu_memory_utilization,
+                           args.block_size, args.activation_gb, args.kv_cache_dtype)
+    if blocks < 1:
+        raise ValueError(f"{args.model} leaves {blocks} KV blocks with these memory settings; "
+                         "raise --gpu_memory_gb or --gpu_memory_utilization")
+    return blocks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KV cache capacity (in blocks) from model and GPU memory config")
+    add_capacity_args(parser)
+    args = parser.parse_args()
+
+    models = [args.model] if args.model else list(MODEL_PRESETS)
+    for model in models:
+        args.model = model
+        spec = MODEL_PRESETS[model]
+        block_bytes = kv_bytes_per_block(spec["num_layers"], spec["num_kv_heads"], spec["head_dim"],
+                                         args.kv_cache_dtype or spec["dtype"], args.block_size)
+        blocks = num_kv_blocks(model, args.gpu_memory_gb, args.gpu_memory_utilization,
+                               args.block_size, args.activation_gb, args.kv_cache_dtype)
+        print(f"{model}: {block_bytes / (1 << 20):.3f} MiB/block, {blocks} blocks, {blocks * args.block_size} tokens")
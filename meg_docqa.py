@@ -1,7 +1,8 @@
 import numpy as np
 import argparse
-from LRU_v2 import LRUCache
-from two_q import TwoQCache
+from cache.LRU_v2 import LRUCache
+from cache.two_q import TwoQCache
+from cache.LIRS import LIRSCache
 
 def read_block_data_lines(path):
     with open(path, "r") as f:
@@ -55,6 +56,15 @@ if __name__ == "__main__":
 
     print(f"TwoQCache Hit Rate: {two_q_cache.hit_rate():.2%}")
 
+    lirs_cache = LIRSCache(max_size=max_size)
+    for row in data:
+        for key, value in row:
+            lirs_cache.get(key)
+        for key, value in reversed(row):
+            lirs_cache.put(key, value)
+
+    print(f"LIRSCache Hit Rate: {lirs_cache.hit_rate():.2%}")
+
     result_filename = f"./result/results_alpha_{args.alpha}.txt"
     with open(result_filename, "a") as f:
-        f.write(f"{cache_size_fraction},{lru_cache.hit_rate():.4f},{two_q_cache.hit_rate():.4f}\n")
+        f.write(f"{cache_size_fraction},{lru_cache.hit_rate():.4f},{two_q_cache.hit_rate():.4f},{lirs_cache.hit_rate():.4f}\n")
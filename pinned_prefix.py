@@ -0,0 +1,260 @@
+import argparse
+import heapq
+import random
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from simulate import replay
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters: at most `size` monitored keys with counts. An
+    unmonitored key takes over the smallest counter (count + 1, with that
+    count as its possible overestimate `error`). Any key seen more than
+    N / size times is guaranteed to be monitored. The minimum is found
+    through a heap of (count, key) entries, skipping stale ones.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.counts = {}    # key -> count
+        self.errors = {}    # key -> overestimate bound
+        self.heap = []
+
+    def add(self, key):
+        if key in self.counts:
+            self.counts[key] += 1
+        elif len(self.counts) < self.size:
+            self.counts[key] = 1
+            self.errors[key] = 0
+        else:
+            while True:
+                count, victim = heapq.heappop(self.heap)
+                if self.counts.get(victim) == count:
+                    break
+            del self.counts[victim], self.errors[victim]
+            self.counts[key] = count + 1
+            self.errors[key] = count
+        heapq.heappush(self.heap, (self.counts[key], key))
+        if len(self.heap) > 4 * self.size:
+            self.heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def top(self, n, min_count=1):
+        """ The n keys with the highest guaranteed count (count - error), at least `min_count` """
+        ranked = heapq.nlargest(n, self.counts, key=lambda k: self.counts[k] - self.errors[k])
+        return [k for k in ranked if self.counts[k] - self.errors[k] >= min_count]
+
+    def decay(self):
+        for key in self.counts:
+            self.counts[key] //= 2
+            self.errors[key] //= 2
+        self.heap = [(c, k) for k, c in self.counts.items()]
+        heapq.heapify(self.heap)
+
+
+class PinnedPrefixCache:
+    """
+    A reserved slice of `pin_ratio` x capacity blocks for the hottest shared
+    prefixes, the rest run by the base policy.
+
+    Every block reference goes into a Space-Saving sketch. Each chained block
+    hash names a whole prefix, and a prefix is always referenced at least as
+    often as its extensions. Every `refresh_interval` prompts the pinned set
+    is rebuilt from the blocks seen at least `min_count` times since the
+    last refresh (halved counts carry history over), best first. A block
+    is pinned together with its whole prefix, and only if that fits, since
+    the sketch's guaranteed counts need not shrink along a chain and a
+    block pinned without its parent could not be reached. Parents are
+    learned from the lookups, which come in prefix order. Newly pinned
+    blocks move out of the base policy, or are pinned on their next put();
+    unpinned ones are dropped, as a put() into the base policy would count
+    as a fresh reference to a prefix that just went cold.
+    """
+    def __init__(self, policy, capacity, pin_ratio=0.1, sketch_size=1024, refresh_interval=100, min_count=4):
+        self.pin_capacity = int(capacity * pin_ratio)
+        self.base = POLICIES[policy](max_size=max(1, capacity - self.pin_capacity))
+        self.sketch = SpaceSaving(max(sketch_size, self.pin_capacity))
+        self.refresh_interval = refresh_interval
+        self.min_count = min_count
+        self.pin_set = set()
+        self.pinned = {}    # resident pinned key -> value
+        self.parent = {}    # key -> previous block of the prompt it was first seen in (None: first block)
+        self._prev = None
+        self.prompts = 0
+
+        self.hit_count = 0
+        self.access_count = 0
+        self.pinned_hit_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if self.pin_capacity:
+            self.sketch.add(key)
+            self.parent.setdefault(key, self._prev)
+            self._prev = key
+        if key in self.pinned:
+            self.hit_count += 1
+            self.pinned_hit_count += 1
+            return self.pinned[key]
+        value = self.base.get(key)
+        if value is not None:
+            self.hit_count += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.pin_set:
+            self.pinned[key] = value
+            return
+        self.base.put(key, value)
+
+    def end_prompt(self):
+        self.prompts += 1
+        self._prev = None
+        if self.pin_capacity and self.prompts % self.refresh_interval == 0:
+            self.refresh()
+
+    def _prefix(self, key):
+        """ key and all its ancestors, None if a link was never seen (or forgotten) """
+        chain = []
+        while key is not None:
+            if key not in self.parent or key in chain:
+                return None
+            chain.append(key)
+            key = self.parent[key]
+        return chain
+
+    def refresh(self):
+        new_pins = set()
+        for key in self.sketch.top(self.pin_capacity, self.min_count):
+            chain = self._prefix(key)
+            if chain is None:
+                continue
+            missing = [k for k in chain if k not in new_pins]
+            if len(new_pins) + len(missing) <= self.pin_capacity:
+                new_pins.update(missing)
+        for key in self.pin_set - new_pins:
+            self.pinned.pop(key, None)
+        for key in new_pins - self.pin_set:
+            if key in self.base:
+                value = self.base.get(key)     # the base's own hit counts are not reported
+                self.base.discard(key)
+                self.pinned[key] = value
+        self.pin_set = new_pins
+        self.sketch.decay()
+        # parent links are only needed for blocks that can still be pinned
+        self.parent = {k: p for k, p in self.parent.items() if k in self.sketch.counts or k in new_pins}
+
+    def __len__(self):
+        return len(self.pinned) + len(self.base)
+
+    def __contains__(self, key):
+        return key in self.pinned or key in self.base
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+def replay_pinned(cache, data):
+    """ simulate.replay with a refresh check after every prompt """
+    for row in data:
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+        cache.end_prompt()
+    return cache.hit_rate()
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def prefix_workload(docs, sequence_length, alpha, system_prompts=4, system_blocks=32,
+                    burst_every=200, burst_length=50, seed=42):
+    """
+    Every prompt is a system prompt (power law over `system_prompts`) followed
+    by a document (power law), hashed after that system prompt as vLLM's
+    chained hashes would be. Every `burst_every` prompts, `burst_length`
+    one-off documents without a system prompt (e.g. a bulk ingestion job)
+    arrive in a row.
+    """
+    rng = random.Random(seed)
+    systems = [[(rng.getrandbits(62), f"sys{s}") for _ in range(system_blocks)] for s in range(system_prompts)]
+    p_sys = np.arange(1, system_prompts + 1) ** -1.0
+    p_sys /= p_sys.sum()
+    p_doc = np.arange(1, len(docs) + 1) ** -alpha
+    p_doc /= p_doc.sum()
+    data = []
+    for i in range(sequence_length):
+        if i % burst_every < burst_length and i >= burst_every:
+            data.append([(rng.getrandbits(62), "one-off") for _ in docs[rng.randrange(len(docs))]])
+            continue
+        s = np.random.choice(system_prompts, p=p_sys)
+        doc = [(hash((s, key)), value) for key, value in docs[np.random.choice(len(docs), p=p_doc)]]
+        data.append(systems[s] + doc)
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pinned hot-prefix reservation: hit-rate gain vs lost flexible capacity")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=1500, help="Numbers of prompts")
+    parser.add_argument("--policy", type=str, default="LRU", choices=list(POLICIES), help="Base policy of the flexible capacity")
+    parser.add_argument("--pin_ratios", type=float, nargs="+", default=[0.01, 0.05, 0.1], help="Capacity reserved for pinned prefixes")
+    parser.add_argument("--refresh_interval", type=int, default=100, help="Prompts between pin-set refreshes")
+    parser.add_argument("--min_count", type=int, default=4, help="References needed to be pinned")
+    parser.add_argument("--sketch_size", type=int, default=1024, help="Counters of the heavy-hitters sketch")
+    parser.add_argument("--trace", type=str, default=None, help="Content-hash trace to replay as is, instead of the synthetic system-prompt mix")
+    parser.add_argument("--system_prompts", type=int, default=4, help="Shared system prompts in the synthetic mix")
+    parser.add_argument("--system_blocks", type=int, default=32, help="Blocks per system prompt")
+    parser.add_argument("--burst_every", type=int, default=200, help="Prompts between bursts of one-off documents")
+    parser.add_argument("--burst_length", type=int, default=50, help="One-off documents per burst")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    max_size = int(668 / args.cache_size_fraction)
+    if args.trace is not None:
+        data = read_block_data_v3(args.trace)
+    else:
+        data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+        docs = read_block_data_v3(data_path)[:]
+        data = prefix_workload(docs, args.sequence_length, args.alpha, args.system_prompts,
+                               args.system_blocks, args.burst_every, args.burst_length)
+
+    baseline = replay(POLICIES[args.policy](max_size=max_size), data)
+    print(f"{args.policy} (no pinning) Hit Rate: {baseline:.2%}")
+    result_filename = f"./result/pinned_prefix_{args.policy}_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("cache_size_fraction,pin_ratio,pinned_blocks,hitrate,gain,pinned_hitrate,flexible_only_hitrate\n")
+        for pin_ratio in tqdm(args.pin_ratios):
+            cache = PinnedPrefixCache(args.policy, max_size, pin_ratio, args.sketch_size,
+                                      args.refresh_interval, args.min_count)
+            hit_rate = replay_pinned(cache, data)
+            pinned_share = cache.pinned_hit_count / max(1, cache.access_count)
+            # the base policy on the flexible capacity alone: what the reservation costs it
+            flexible_only = replay(POLICIES[args.policy](max_size=max(1, max_size - cache.pin_capacity)), data)
+            print(f"pin {pin_ratio:.0%} ({cache.pin_capacity} blocks): Hit Rate {hit_rate:.2%} "
+                  f"(gain {(hit_rate - baseline) * 100:+.2f} pts; pinned hits {pinned_share:.2%}, "
+                  f"{args.policy} on the flexible {max_size - cache.pin_capacity} blocks alone {flexible_only:.2%}, "
+                  f"lost {(baseline - flexible_only) * 100:.2f} pts)")
+            f.write(f"{args.cache_size_fraction},{pin_ratio},{cache.pin_capacity},{hit_rate:.4f},"
+                    f"{hit_rate - baseline:.4f},{pinned_share:.4f},{flexible_only:.4f}\n")
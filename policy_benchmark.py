@@ -0,0 +1,118 @@
+import argparse
+import time
+
+import numpy as np
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from cache.SIEVE import SIEVECache
+from cache.S3_FIFO import S3FIFOCache
+from cache.W_TinyLFU import WTinyLFUCache
+from cache.LIRS import LIRSCache
+from cache.CAR import CARCache
+from cache.CLOCK_Pro import CLOCKProCache
+from cache.DBL_adaptive import AdaptiveDBLCache
+from cache.LeCaR import LeCaRCache
+from distribution_shift import power_law_with_hotspot, windowed_powerlaw_sampling
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+    "SIEVE": SIEVECache,
+    "S3FIFO": S3FIFOCache,
+    "WTinyLFU": WTinyLFUCache,
+    "LIRS": LIRSCache,
+    "CAR": CARCache,
+    "CLOCKPro": CLOCKProCache,
+    "ADBL": AdaptiveDBLCache,
+    "LeCaR": LeCaRCache,
+}
+
+WORKLOADS = ("power_law", "hotspot", "shift")
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(data, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, len(data) + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+def make_workload(name, data, sequence_length, alpha):
+    if name == "power_law":
+        return power_law_sampling(data, sequence_length, alpha)
+    if name == "hotspot":
+        return power_law_with_hotspot(data, total_length=sequence_length, exponent=alpha,
+                                      window_size=20, hotspot_ratio=0.1, hotspot_boost=10)
+    if name == "shift":
+        # popularity ranks reshuffled six times over the trace
+        return windowed_powerlaw_sampling(list(data), total_length=sequence_length,
+                                          window_size=max(1, sequence_length // 6), alpha=alpha)
+    raise ValueError(f"unknown workload {name}")
+
+
+def timed_replay(cache, data):
+    """
+    simulate.replay with the lookup phase (where a hit is served) and the
+    write-back phase timed separately. Returns (hit_rate, us per lookup,
+    us per write-back).
+    """
+    get_time = put_time = 0.0
+    lookups = 0
+    for row in data:
+        t0 = time.perf_counter()
+        for key, value in row:
+            cache.get(key)
+        t1 = time.perf_counter()
+        for key, value in reversed(row):
+            cache.put(key, value)
+        t2 = time.perf_counter()
+        get_time += t1 - t0
+        put_time += t2 - t1
+        lookups += len(row)
+    lookups = max(1, lookups)
+    return cache.hit_rate(), get_time / lookups * 1e6, put_time / lookups * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hit rate and per-access cost of every policy on the standard workloads")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=3000, help="Numbers of prompts")
+    parser.add_argument("--workloads", type=str, nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument("--policies", type=str, nargs="+", default=["LRU", "ARC", "DBL", "SIEVE", "S3FIFO", "CAR", "CLOCKPro"], choices=list(POLICIES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per cell, the fastest one is reported")
+    args = parser.parse_args()
+
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_size = int(668 / args.cache_size_fraction)
+    docs = read_block_data_v3(data_path)
+
+    result_filename = f"./result/policy_benchmark_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("workload,policy,hitrate,us_per_lookup,us_per_writeback\n")
+        for workload in args.workloads:
+            np.random.seed(42)
+            data = make_workload(workload, docs, args.sequence_length, args.alpha)
+            for name in args.policies:
+                runs = [timed_replay(POLICIES[name](max_size=max_size), data) for _ in range(args.repeat)]
+                hit_rate = runs[0][0]
+                get_us = min(r[1] for r in runs)
+                put_us = min(r[2] for r in runs)
+                print(f"{workload}: {name}Cache Hit Rate: {hit_rate:.2%}, "
+                      f"lookup {get_us:.2f} us, write-back {put_us:.2f} us per block")
+                f.write(f"{workload},{name},{hit_rate:.4f},{get_us:.3f},{put_us:.3f}\n")
@@ -0,0 +1,163 @@
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+
+class PrefixTreeIndex:
+    """
+    Parent/child index over chained block hashes, wrapped around a policy.
+
+    vLLM only reaches a block through its whole prefix, so a hit counts only
+    while every earlier block of the prompt is cached (`prefix_hit_count`);
+    the policy's own `hit_count` counts every resident block. When a block is
+    evicted, its cached descendants become unreachable. With `reclaim=True`
+    they are dropped from the policy (`cache.discard`) so the space goes to
+    reusable blocks; otherwise they are only counted as orphans.
+    """
+
+    def __init__(self, cache, reclaim=False):
+        self.cache = cache
+        self.reclaim = reclaim
+        self.parent = {}        # key -> parent key (None for the first block)
+        self.children = {}      # key -> set of child keys
+        self.orphans = set()    # cached blocks with an evicted ancestor
+        self._evicted = []
+        self.cache.on_evict = self._on_evict
+
+        self.prefix_hit_count = 0
+        self.access_count = 0
+        self.orphaned_count = 0     # blocks that became unreachable
+        self.reclaimed_count = 0
+        self.orphan_occupancy = 0   # sum over prompts of len(orphans)
+        self.prompts = 0
+
+    def _on_evict(self, key, value):
+        self._evicted.append(key)
+        self.orphans.discard(key)
+
+    def _link(self, row):
+        prev = None
+        for key, _ in row:
+            if key not in self.parent:
+                self.parent[key] = prev
+                if prev is not None:
+                    self.children.setdefault(prev, set()).add(key)
+            prev = key
+
+    def _cached_descendants(self, key):
+        stack, found = list(self.children.get(key, ())), []
+        while stack:
+            child = stack.pop()
+            if child in self.cache:     # uncached nodes were handled when they left
+                found.append(child)
+                stack.extend(self.children.get(child, ()))
+        return found
+
+    def process(self, row):
+        """ One prompt: lookups, then the reversed writes, like simulate.replay """
+        reachable = True
+        for key, value in row:
+            self.access_count += 1
+            hit = self.cache.get(key) is not None
+            reachable = reachable and hit
+            if reachable:
+                self.prefix_hit_count += 1
+        for key, value in reversed(row):
+            self.cache.put(key, value)
+        self._link(row)
+
+        # the prompt's own chain is complete again, and so is every cached
+        # branch below it that an earlier eviction had cut off (a cached
+        # child that is not an orphan has no orphans below it)
+        stack = [key for key, _ in row]
+        while stack:
+            key = stack.pop()
+            self.orphans.discard(key)
+            stack.extend(child for child in self.children.get(key, ()) if child in self.orphans)
+
+        evicted, self._evicted = self._evicted, []
+        for key in evicted:
+            if key in self.cache:
+                continue            # evicted and put back by the same prompt
+            for child in self._cached_descendants(key):
+                if child in self.orphans:
+                    continue
+                self.orphaned_count += 1
+                if self.reclaim:
+                    self.cache.discard(child)
+                    self.reclaimed_count += 1
+                else:
+                    self.orphans.add(child)
+        self.prompts += 1
+        self.orphan_occupancy += len(self.orphans)
+
+    def replay(self, data):
+        for row in data:
+            self.process(row)
+        return self.prefix_hit_rate()
+
+    def prefix_hit_rate(self):
+        return self.prefix_hit_count / self.access_count if self.access_count > 0 else 0.0
+
+    def report(self):
+        return {
+            "raw_hit_rate": self.cache.hit_rate(),
+            "prefix_hit_rate": self.prefix_hit_rate(),
+            "orphaned_blocks": self.orphaned_count,
+            "reclaimed_blocks": self.reclaimed_count,
+            "mean_orphan_occupancy": self.orphan_occupancy / self.prompts if self.prompts else 0.0,
+        }
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(num_elements, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefix-reachable hit rate and orphaned blocks per policy")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--policies", type=str, nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_size = int(668 / args.cache_size_fraction)
+    data = read_block_data_v3(data_path)[:]
+    data = power_law_sampling(len(data), sequence_length=args.sequence_length, exponent=args.alpha)
+
+    for name in args.policies:
+        for reclaim in (False, True):
+            index = PrefixTreeIndex(POLICIES[name](max_size=max_size), reclaim=reclaim)
+            index.replay(tqdm(data, leave=False))
+            report = index.report()
+            print(f"{name}Cache{' (reclaim)' if reclaim else ''}: raw Hit Rate {report['raw_hit_rate']:.2%}, "
+                  f"prefix Hit Rate {report['prefix_hit_rate']:.2%}, orphaned {report['orphaned_blocks']}, "
+                  f"reclaimed {report['reclaimed_blocks']}, mean orphans cached {report['mean_orphan_occupancy']:.1f}")
@@ -0,0 +1,296 @@
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from cache.SIEVE import SIEVECache
+from cache.S3_FIFO import S3FIFOCache
+from cache.W_TinyLFU import WTinyLFUCache
+from cache.LIRS import LIRSCache
+from cache.CAR import CARCache
+from cache.CLOCK_Pro import CLOCKProCache
+from cache.GDSF import GDSFCache
+from cache.LeCaR import LeCaRCache
+from kv_capacity import MODEL_PRESETS
+from ttft_model import PrefillCostModel, attention_share, ttft_report
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+    "SIEVE": SIEVECache,
+    "S3FIFO": S3FIFOCache,
+    "WTinyLFU": WTinyLFUCache,
+    "LIRS": LIRSCache,
+    "CAR": CARCache,
+    "CLOCKPro": CLOCKProCache,
+    "GDSF": GDSFCache,
+    "LeCaR": LeCaRCache,
+}
+
+
+class PriorityCache:
+    """
+    Any policy in cache/ made aware of request priorities (vLLM convention:
+    a lower value is more important, class 0 first).
+
+    A cached block belongs to the most important class that referenced it
+    and lives in that class's instance of the policy; the instances share
+    `capacity` blocks. When the pool is full the least important class
+    gives up a block (its policy picks which), so blocks only referenced by
+    batch requests go before interactive ones. Two guards keep the
+    unimportant classes from starving:
+
+    - every class below class 0 keeps at least `min_share` of the capacity
+      while it has that many blocks
+    - a block loses its class after `protect_prompts` prompts without a
+      reference from that class and moves one class down
+
+    With `aware=False` every block goes to one instance (the plain policy),
+    with per-class hit counts still kept for the comparison.
+    """
+    def __init__(self, policy, capacity, num_classes=2, aware=True, min_share=0.1, protect_prompts=500):
+        self.capacity = capacity
+        self.num_classes = num_classes
+        self.aware = aware
+        self.floor = min_share * capacity
+        self.protect_prompts = protect_prompts
+        self.partitions = [POLICIES[policy](max_size=capacity) for _ in range(num_classes if aware else 1)]
+        for c, partition in enumerate(self.partitions):
+            partition.on_evict = self._make_on_evict(c)
+            if aware and isinstance(partition, DBLCachePQ):
+                partition.k = capacity      # A1in's quota is applied in _evict_from, see there
+        self.blocks = {}    # cached key -> [class, value]
+        self.protected = [OrderedDict() for _ in range(num_classes)]    # key -> last prompt of its class
+        self.size = 0
+        self.prompts = 0
+
+        self.hit_count = 0
+        self.access_count = 0
+        self.class_hits = [0] * num_classes
+        self.class_accesses = [0] * num_classes
+
+    def _make_on_evict(self, c):
+        def on_evict(key, value):
+            del self.blocks[key]
+            self.protected[c].pop(key, None)
+            self.size -= 1
+        return on_evict
+
+    def _class(self, priority):
+        return min(max(int(priority), 0), self.num_classes - 1)
+
+    def get(self, key, priority=0):
+        c = self._class(priority)
+        self.access_count += 1
+        self.class_accesses[c] += 1
+        block = self.blocks.get(key)
+        # the lookup goes to the instance the following put() uses: SIEVE,
+        # S3-FIFO and W-TinyLFU count references in get(), GDSF learns positions
+        home = c if self.aware else 0
+        if block is not None and block[0] <= home:
+            home = block[0]
+        self.partitions[home].get(key)
+        if block is None:
+            return None
+        self.hit_count += 1
+        self.class_hits[c] += 1
+        return block[1]
+
+    def put(self, key, value, priority=0):
+        c = self._class(priority) if self.aware else 0
+        block = self.blocks.get(key)
+        if block is None:
+            self.blocks[key] = [c, value]
+            self.size += 1
+            self.partitions[c].put(key, value)
+        elif c < block[0]:      # first reference from a more important class
+            self.partitions[block[0]].discard(key)
+            self.protected[block[0]].pop(key, None)
+            block[0] = c
+            self.partitions[c].put(key, value)
+        else:
+            self.partitions[block[0]].put(key, value)
+        # only a reference from the block's own class renews its protection
+        if self.aware and c == self.blocks[key][0] and c < self.num_classes - 1:
+            self.protected[c][key] = self.prompts
+            self.protected[c].move_to_end(key)
+        while self.size > self.capacity:
+            self._evict()
+
+    def _evict(self):
+        """ Evict from the least important class that is above its floor (class 0 has none) """
+        for c in reversed(range(len(self.partitions))):
+            if len(self.partitions[c]) > (self.floor if c > 0 else 0):
+                self._evict_from(self.partitions[c])
+                return
+        for partition in reversed(self.partitions):
+            if len(partition):
+                self._evict_from(partition)
+                return
+
+    def _evict_from(self, partition):
+        """
+        Every partition is sized for the whole pool, so none reclaims space
+        on its own while the pool has room. DBL would still drop A1in blocks
+        at its fixed quota; in priority mode its quota is half of what the
+        partition holds when the pool evicts from it (half of max_size when
+        full, as plain DBL).
+        """
+        if self.aware and isinstance(partition, DBLCachePQ):
+            partition.k = max(1, int(len(partition) * 0.5))
+            partition.evict()
+            partition.k = self.capacity
+        else:
+            partition.evict()
+
+    def end_prompt(self):
+        self.prompts += 1
+        if not self.aware:
+            return
+        for c in range(self.num_classes - 1):
+            protected = self.protected[c]
+            while protected:
+                key, last = next(iter(protected.items()))
+                if self.prompts - last <= self.protect_prompts:
+                    break
+                del protected[key]
+                self._demote(key, c)
+
+    def _demote(self, key, c):
+        block = self.blocks[key]
+        self.partitions[c].discard(key)
+        block[0] = c + 1
+        self.partitions[c + 1].put(key, block[1])
+        if c + 1 < self.num_classes - 1:
+            self.protected[c + 1][key] = self.prompts
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self.blocks
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+    def class_hit_rates(self):
+        return [h / a if a else 0.0 for h, a in zip(self.class_hits, self.class_accesses)]
+
+
+def replay_priorities(cache, data):
+    """ simulate.replay_prompt_hits(prefix=True) for (priority, row) prompts """
+    prefix_hits = []
+    for priority, row in data:
+        cached_prefix, in_prefix = 0, True
+        for key, value in row:
+            in_prefix = cache.get(key, priority) is not None and in_prefix
+            cached_prefix += in_prefix
+        for key, value in reversed(row):
+            cache.put(key, value, priority)
+        cache.end_prompt()
+        prefix_hits.append(cached_prefix)
+    return prefix_hits
+
+
+def read_priority_data(path, default_priority=0):
+    """
+    Content-hash trace with priorities: `!priority hash hash ...` per prompt
+    (untagged lines get `default_priority`; `@tenant` tags are skipped).
+    """
+    data = []
+    with open(path, "r") as f:
+        for i, line in enumerate(f):
+            fields = line.split()
+            priority = default_priority
+            while fields and fields[0][0] in "!@":
+                if fields[0][0] == "!":
+                    priority = int(fields[0][1:])
+                fields = fields[1:]
+            if fields:
+                data.append((priority, [(int(num), str(i + 1)) for num in fields]))
+    return data
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def priority_workload(docs, sequence_length, alpha, batch_share, interactive_docs=0.1):
+    """
+    Interactive prompts (priority 0) sample the first `interactive_docs` of
+    the documents by power law; batch prompts (priority 1) scan the rest in
+    order, flushing an LRU.
+    """
+    split = max(1, int(len(docs) * interactive_docs))
+    p = np.arange(1, split + 1) ** -alpha
+    p /= p.sum()
+    batch_docs = docs[split:] or docs
+    data, next_batch = [], 0
+    for is_batch in np.random.random(sequence_length) < batch_share:
+        if is_batch:
+            data.append((1, batch_docs[next_batch % len(batch_docs)]))
+            next_batch += 1
+        else:
+            data.append((0, docs[np.random.choice(split, p=p)]))
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Priority-aware eviction: hit rate and TTFT per priority class")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=1500, help="Numbers of prompts")
+    parser.add_argument("--policy", type=str, default="LRU", choices=list(POLICIES))
+    parser.add_argument("--trace", type=str, default=None, help="Priority-tagged trace (`!priority hash ...`) instead of the synthetic mix")
+    parser.add_argument("--num_classes", type=int, default=2, help="Priority classes (larger priorities are clamped to the last)")
+    parser.add_argument("--batch_share", type=float, default=0.5, help="Share of batch (priority 1) prompts in the synthetic mix")
+    parser.add_argument("--min_share", type=float, default=0.1, help="Capacity every lower class keeps (starvation guard)")
+    parser.add_argument("--protect_prompts", type=int, default=500, help="Prompts without a reference before a block drops one class")
+    parser.add_argument("--block_size", type=int, default=16, help="Tokens per KV block")
+    parser.add_argument("--calibrate_from", type=str, default="./view_exp_result/Qwen2.5-1.5B-Instruct_wikiQA_hotspot.csv", help="vLLM sweep CSV for the TTFT model (see ttft_model.py)")
+    parser.add_argument("--calib_prompt_tokens", type=float, default=2048, help="Mean prompt length (tokens) of the calibration sweep")
+    parser.add_argument("--calib_model", type=str, default="Qwen2.5-1.5B-Instruct", choices=list(MODEL_PRESETS), help="Model of the calibration sweep, sets the attention share of the fitted cost")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    max_size = int(668 / args.cache_size_fraction)
+    if args.trace is not None:
+        data = read_priority_data(args.trace)
+    else:
+        data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+        docs = read_block_data_v3(data_path)[:]
+        data = priority_workload(docs, args.sequence_length, args.alpha, args.batch_share)
+    model = PrefillCostModel.from_hitrate_csv(args.calibrate_from, args.calib_prompt_tokens,
+                                              attention_share(args.calib_model, args.calib_prompt_tokens))
+
+    result_filename = f"./result/priority_cache_{args.policy}_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("cache_size_fraction,mode,priority,prompts,hitrate,ttft_mean,ttft_p90,ttft_p99\n")
+        for aware in (False, True):
+            mode = "priority" if aware else "plain"
+            cache = PriorityCache(args.policy, max_size, args.num_classes, aware, args.min_share, args.protect_prompts)
+            prefix_hits = replay_priorities(cache, tqdm(data, leave=False))
+            print(f"{mode} {args.policy} Hit Rate: {cache.hit_rate():.2%}")
+            for c, hit_rate in enumerate(cache.class_hit_rates()):
+                picked = [i for i, (priority, _) in enumerate(data) if min(max(priority, 0), args.num_classes - 1) == c]
+                if not picked:
+                    continue
+                report = ttft_report([prefix_hits[i] for i in picked], [data[i][1] for i in picked],
+                                     model, args.block_size)
+                print(f"  priority {c}: {len(picked)} prompts, Hit Rate {hit_rate:.2%}, "
+                      f"TTFT mean {report['ttft_mean'] * 1000:.1f} ms, p90 {report['ttft_p90'] * 1000:.1f} ms, "
+                      f"p99 {report['ttft_p99'] * 1000:.1f} ms")
+                f.write(f"{args.cache_size_fraction},{mode},{c},{len(picked)},{hit_rate:.4f},"
+                        f"{report['ttft_mean']:.4f},{report['ttft_p90']:.4f},{report['ttft_p99']:.4f}\n")
@@ -0,0 +1,110 @@
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from simulate import replay
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+# two-sided 95% Student t quantiles, df = 1..30 (normal quantile above that)
+T_975 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+         2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(rng, data, sequence_length=800, exponent=1.0):
+    values = np.arange(1, len(data) + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = rng.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+def confidence_interval(samples):
+    """ (mean, half width) of the 95% t confidence interval """
+    n = len(samples)
+    mean = sum(samples) / n
+    if n < 2:
+        return mean, math.nan
+    std = math.sqrt(sum((x - mean) ** 2 for x in samples) / (n - 1))
+    t = T_975[n - 2] if n - 1 <= len(T_975) else 1.96
+    return mean, t * std / math.sqrt(n)
+
+
+_docs = None
+
+def _init_worker(data_path):
+    global _docs
+    _docs = read_block_data_v3(data_path)
+
+
+def run_replica(seed_seq, sequence_length, alpha, max_sizes, policies):
+    """
+    One replica: its own trace from its own Generator stream, replayed by
+    every policy at every cache size. Returns {(policy, max_size): hit_rate}.
+    """
+    rng = np.random.default_rng(seed_seq)
+    data = power_law_sampling(rng, _docs, sequence_length=sequence_length, exponent=alpha)
+    hit_rates = {}
+    for max_size in max_sizes:
+        for name in policies:
+            hit_rates[(name, max_size)] = replay(POLICIES[name](max_size=max_size), data)
+    return hit_rates
+
+
+def replicate(data_path, replicas, workers, seed, sequence_length, alpha, max_sizes, policies):
+    # replica i always gets the i-th spawned stream, whatever the number of workers
+    seed_seqs = np.random.SeedSequence(seed).spawn(replicas)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_path,)) as pool:
+        futures = [pool.submit(run_replica, s, sequence_length, alpha, max_sizes, policies)
+                   for s in seed_seqs]
+        return [f.result() for f in tqdm(futures, desc="replicas")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-seed replication of the power-law experiment")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, nargs="+", default=[0.01, 0.05, 0.1, 0.2], help="Fractions of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--replicas", type=int, default=10, help="Number of independent traces")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=42, help="Root seed the replica streams are spawned from")
+    parser.add_argument("--policies", type=str, nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    args = parser.parse_args()
+
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_sizes = [int(668 / fraction) for fraction in args.cache_size_fraction]
+
+    results = replicate(data_path, args.replicas, args.workers, args.seed,
+                        args.sequence_length, args.alpha, max_sizes, args.policies)
+
+    result_filename = f"./result/replicated_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("cache_size_fraction,policy,mean_hitrate,ci_low,ci_high,replicas\n")
+        for fraction, max_size in zip(args.cache_size_fraction, max_sizes):
+            for name in args.policies:
+                mean, half = confidence_interval([r[(name, max_size)] for r in results])
+                print(f"frac={fraction} {name}Cache Hit Rate: {mean:.2%} +/- {half:.2%}")
+                f.write(f"{fraction},{name},{mean:.4f},{mean - half:.4f},{mean + half:.4f},{args.replicas}\n")
@@ -0,0 +1,105 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+
+
+def trace_fingerprint(path, chunk_size=1 << 20):
+    """ sha256 of the raw trace file, so an edited trace never reuses old results """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def code_fingerprint(*objects):
+    """ sha256 of the source files defining `objects`, so a changed policy never reuses old results """
+    h = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def cell_key(params):
+    """
+    Content address of one experiment cell. `params` must contain everything
+    that changes the result: trace fingerprint, workload generator and its
+    parameters, seed, policy name, policy parameters, cache size and the
+    code fingerprint of the policy and the replay loop.
+    """
+    blob = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def cache_result(cache, **extra):
+    """ Hit statistics of a finished cache, plus any extra fields to store with them """
+    return dict(extra, hit_rate=cache.hit_rate(),
+                hit_count=cache.hit_count, access_count=cache.access_count)
+
+
+class ResultStore:
+    COLUMNS = ("hit_rate", "hit_count", "access_count")
+
+    def __init__(self, path="./result/results.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " params TEXT NOT NULL,"
+            " hit_rate REAL NOT NULL,"
+            " hit_count INTEGER,"
+            " access_count INTEGER,"
+            " created REAL NOT NULL,"
+            " extra TEXT)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        if "extra" not in columns:     # stores created before extra fields existed
+            self.conn.execute("ALTER TABLE results ADD COLUMN extra TEXT")
+        self.conn.commit()
+
+    def get(self, params):
+        row = self.conn.execute(
+            "SELECT hit_rate, hit_count, access_count, extra FROM results WHERE key = ?",
+            (cell_key(params),),
+        ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[3]) if row[3] else {}
+        result.update(zip(self.COLUMNS, row[:3]))
+        return result
+
+    def put(self, params, result):
+        extra = {k: v for k, v in result.items() if k not in self.COLUMNS}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results"
+            " (key, params, hit_rate, hit_count, access_count, created, extra)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cell_key(params), json.dumps(params, sort_keys=True),
+             result["hit_rate"], result.get("hit_count"), result.get("access_count"),
+             time.time(), json.dumps(extra) if extra else None),
+        )
+        self.conn.commit()
+
+    def get_or_run(self, params, run):
+        """
+        Return the stored result of a cell, or call `run()` (which must return
+        a result dict such as `cache_result(cache)`) and store it.
+        Returns (result, cached).
+        """
+        result = self.get(params)
+        if result is not None:
+            return result, True
+        result = run()
+        self.put(params, result)
+        return result, False
+
+    def close(self):
+        self.conn.close()
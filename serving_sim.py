@@ -0,0 +1,252 @@
+import argparse
+import heapq
+import itertools
+import math
+from collections import deque
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from kv_capacity import add_capacity_args, capacity_from_args
+from ttft_model import PrefillCostModel
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+
+class BlockPool:
+    """
+    vLLM-style KV block pool around an eviction policy.
+
+    Blocks of running requests are reference counted and taken out of the
+    policy (`cache.remove`), so they can never be evicted. The policy only
+    holds cached blocks with ref count 0; a block goes back to it (`cache.put`)
+    when the last request using it finishes. Blocks of generated tokens are
+    pinned too but never shared. Cached + pinned blocks never exceed `num_blocks`.
+    """
+
+    def __init__(self, cache, num_blocks):
+        self.cache = cache
+        self.num_blocks = num_blocks
+        self.ref_count = {}     # key -> number of running requests using the block
+        self.decode_blocks = 0  # private blocks of generated tokens
+        self.hit_count = 0
+        self.access_count = 0
+        self.evict_count = 0
+
+    def used_blocks(self):
+        return len(self.cache) + len(self.ref_count) + self.decode_blocks
+
+    def can_allocate(self, row, decode_blocks):
+        # every block of the prompt that is not pinned yet needs a slot (hits
+        # in the policy move out of it, so they occupy their own slot as well)
+        needed = sum(1 for key, _ in row if key not in self.ref_count)
+        return len(self.ref_count) + self.decode_blocks + needed + decode_blocks <= self.num_blocks
+
+    def allocate(self, row, decode_blocks):
+        """
+        Pin a prompt's blocks; returns the cached prefix (blocks before the
+        first miss), the part prefill skips. Hits after a miss still count
+        toward the hit rate.
+        """
+        hits, cached_prefix = 0, 0
+        for position, (key, value) in enumerate(row):
+            self.access_count += 1
+            if key in self.ref_count:           # shared with a running request
+                hits += 1
+                self.ref_count[key] += 1
+            elif self.cache.get(key) is not None:
+                hits += 1
+                self.cache.remove(key)
+                self.ref_count[key] = 1
+            else:
+                self.ref_count[key] = 1
+            cached_prefix += hits == position + 1
+        self.decode_blocks += decode_blocks
+        while self.used_blocks() > self.num_blocks:
+            self.cache.evict()
+            self.evict_count += 1
+        self.hit_count += hits
+        return cached_prefix
+
+    def release(self, row, decode_blocks):
+        self.decode_blocks -= decode_blocks
+        for key, value in reversed(row):
+            self.ref_count[key] -= 1
+            if self.ref_count[key] == 0:
+                del self.ref_count[key]
+                self.cache.put(key, value)
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+
+class ServingSimulator:
+    """
+    Discrete-event model of a vLLM engine: requests arrive over time, wait in a
+    FCFS queue, and run once a batch slot (`max_batch`) and enough KV blocks are
+    free. A running request keeps its blocks pinned for its prefill
+    (`prefill_time_per_block` per missed block, or a ttft_model.PrefillCostModel
+    as `cost_model`) plus `decode_len` decode steps.
+    """
+
+    def __init__(self, cache, num_blocks, max_batch=256, block_size=16,
+                 decode_step=0.02, prefill_time_per_block=0.002, cost_model=None):
+        self.pool = BlockPool(cache, num_blocks)
+        self.max_batch = max_batch
+        self.block_size = block_size
+        self.decode_step = decode_step
+        self.prefill_time_per_block = prefill_time_per_block
+        self.cost_model = cost_model
+
+    def run(self, requests):
+        """
+        `requests` is a list of (arrival_time, row, decode_len). Returns a dict
+        of summary statistics.
+        """
+        events = []                 # (time, seq, kind, request index)
+        seq = itertools.count()
+        for i, (arrival, _, _) in enumerate(requests):
+            heapq.heappush(events, (arrival, next(seq), "arrival", i))
+
+        queue = deque()
+        running = 0
+        rejected = 0
+        now = 0.0
+        waits = []
+        ttfts = []                  # queueing + prefill
+        busy_area = 0.0             # integral of running requests over time
+        peak_running = 0
+        peak_pinned = 0
+
+        def decode_blocks(i):
+            return math.ceil(requests[i][2] / self.block_size)
+
+        while events:
+            time, _, kind, i = heapq.heappop(events)
+            busy_area += running * (time - now)
+            now = time
+            if kind == "arrival":
+                _, row, _ = requests[i]
+                if len(row) + decode_blocks(i) > self.pool.num_blocks:
+                    rejected += 1   # could never fit, even into an empty pool
+                else:
+                    queue.append(i)
+            else:
+                _, row, _ = requests[i]
+                self.pool.release(row, decode_blocks(i))
+                running -= 1
+
+            # FCFS: the head of the queue blocks everything behind it
+            while queue and running < self.max_batch:
+                j = queue[0]
+                arrival, row, decode_len = requests[j]
+                if not self.pool.can_allocate(row, decode_blocks(j)):
+                    break
+                queue.popleft()
+                cached_prefix = self.pool.allocate(row, decode_blocks(j))
+                running += 1
+                waits.append(now - arrival)
+                if self.cost_model is not None:
+                    prefill = self.cost_model.ttft(len(row) * self.block_size, cached_prefix * self.block_size)
+                else:
+                    prefill = (len(row) - cached_prefix) * self.prefill_time_per_block
+                ttfts.append(now - arrival + prefill)
+                heapq.heappush(events, (now + prefill + decode_len * self.decode_step, next(seq), "finish", j))
+            peak_running = max(peak_running, running)
+            peak_pinned = max(peak_pinned, len(self.pool.ref_count) + self.pool.decode_blocks)
+
+        return {
+            "hit_rate": self.pool.hit_rate(),
+            "completed": len(waits),
+            "rejected": rejected,
+            "mean_wait": float(np.mean(waits)) if waits else 0.0,
+            "p99_wait": float(np.percentile(waits, 99)) if waits else 0.0,
+            "ttft_p50": float(np.percentile(ttfts, 50)) if ttfts else 0.0,
+            "ttft_p99": float(np.percentile(ttfts, 99)) if ttfts else 0.0,
+            "mean_running": busy_area / now if now > 0 else 0.0,
+            "peak_running": peak_running,
+            "peak_pinned_blocks": peak_pinned,
+            "evictions": self.pool.evict_count,
+            "makespan": now,
+        }
+
+
+def poisson_arrivals(rng, n, rate):
+    return np.cumsum(rng.exponential(1.0 / rate, size=n))
+
+
+def read_arrivals(path):
+    """ One arrival time (seconds) per line, aligned with the prompts of the trace """
+    with open(path, "r") as f:
+        return [float(line) for line in f if line.strip()]
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(rng, data, sequence_length=800, exponent=1.0):
+    values = np.arange(1, len(data) + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = rng.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-driven serving simulation with in-flight block pinning")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--rate", type=float, default=2.0, help="Poisson arrival rate (requests/s)")
+    parser.add_argument("--arrivals", type=str, default=None, help="File with one arrival time per prompt, replaces --rate")
+    parser.add_argument("--trace", type=str, default=None, help="Replay this trace in order instead of power-law sampling")
+    parser.add_argument("--decode_len", type=float, default=128, help="Mean number of generated tokens (geometric)")
+    parser.add_argument("--decode_step", type=float, default=0.02, help="Seconds per decode step")
+    parser.add_argument("--prefill_time_per_block", type=float, default=0.002, help="Prefill seconds per missed block")
+    parser.add_argument("--prefill_curve", type=str, default=None, help="CSV with columns tokens,seconds (see ttft_model.py), replaces --prefill_time_per_block")
+    parser.add_argument("--max_batch", type=int, default=256, help="Max concurrently running requests (max_num_seqs)")
+    parser.add_argument("--policies", type=str, nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--seed", type=int, default=42)
+    add_capacity_args(parser)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.trace:
+        data = read_block_data_v3(args.trace)
+    else:
+        data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+        data = power_law_sampling(rng, read_block_data_v3(data_path),
+                                  sequence_length=args.sequence_length, exponent=args.alpha)
+    if args.arrivals:
+        arrivals = read_arrivals(args.arrivals)[:len(data)]
+        data = data[:len(arrivals)]
+    else:
+        arrivals = poisson_arrivals(rng, len(data), args.rate)
+    decode_lens = rng.geometric(1.0 / args.decode_len, size=len(data))
+    requests = list(zip(arrivals, data, decode_lens))
+
+    num_blocks = capacity_from_args(args) if args.model else int(668 / args.cache_size_fraction)
+    print("num_blocks:", num_blocks)
+    cost_model = PrefillCostModel.from_curve_csv(args.prefill_curve) if args.prefill_curve else None
+    for name in tqdm(args.policies):
+        sim = ServingSimulator(POLICIES[name](max_size=num_blocks), num_blocks, args.max_batch,
+                               args.block_size, args.decode_step, args.prefill_time_per_block, cost_model)
+        stats = sim.run(requests)
+        print(f"{name}Cache Hit Rate: {stats['hit_rate']:.2%}, mean wait {stats['mean_wait']:.3f}s, "
+              f"p99 wait {stats['p99_wait']:.3f}s, TTFT p50 {stats['ttft_p50']:.3f}s p99 {stats['ttft_p99']:.3f}s, mean running {stats['mean_running']:.1f}, "
+              f"peak pinned {stats['peak_pinned_blocks']}, rejected {stats['rejected']}")
@@ -0,0 +1,238 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from cache.SIEVE import SIEVECache
+from cache.S3_FIFO import S3FIFOCache
+from cache.CAR import CARCache
+from cache.LIRS import LIRSCache
+from cache.DBL_adaptive import AdaptiveDBLCache
+from kv_capacity import add_capacity_args, capacity_from_args
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+    "SIEVE": SIEVECache,
+    "S3FIFO": S3FIFOCache,
+    "CAR": CARCache,
+    "LIRS": LIRSCache,
+    "ADBL": AdaptiveDBLCache,
+}
+
+
+def parse_prompt(line):
+    """ One logger line -> list of block hashes (empty for blank lines), None if it is not hashes """
+    try:
+        return [int(num) for num in line.split()]
+    except ValueError:
+        return None
+
+
+async def enqueue(line, queue, shadow):
+    prompt = parse_prompt(line)
+    if prompt is None:
+        shadow.skipped += 1
+    elif prompt:
+        await queue.put(prompt)     # waits while the backlog is full
+
+
+class ShadowCaches:
+    """
+    The same prompts replayed against several policies at one capacity, as
+    simulate.replay does, with cumulative and rolling (last `window` prompts)
+    hit rates per policy. apply() runs on one worker thread; snapshot() may
+    be called from the event loop at any time and only reads counters.
+    """
+
+    def __init__(self, policies, max_size, window=1000):
+        self.caches = {name: POLICIES[name](max_size=max_size) for name in policies}
+        self.max_size = max_size
+        self.window = window
+        self.recent = {name: deque() for name in policies}     # (hits, accesses) per prompt
+        self.recent_hits = dict.fromkeys(policies, 0)
+        self.recent_accesses = dict.fromkeys(policies, 0)
+        self.prompts = 0
+        self.blocks = 0
+        self.skipped = 0    # logger lines that were not block hashes
+        self.started = time.time()
+
+    def apply(self, prompts):
+        for blocks in prompts:
+            for name, cache in self.caches.items():
+                hits = 0
+                for key in blocks:
+                    if cache.get(key) is not None:
+                        hits += 1
+                for key in reversed(blocks):
+                    cache.put(key, key)
+                recent = self.recent[name]
+                recent.append((hits, len(blocks)))
+                self.recent_hits[name] += hits
+                self.recent_accesses[name] += len(blocks)
+                if len(recent) > self.window:
+                    old_hits, old_accesses = recent.popleft()
+                    self.recent_hits[name] -= old_hits
+                    self.recent_accesses[name] -= old_accesses
+            self.prompts += 1
+            self.blocks += len(blocks)
+
+    def snapshot(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            "max_size": self.max_size,
+            "prompts": self.prompts,
+            "blocks": self.blocks,
+            "skipped_lines": self.skipped,
+            "prompts_per_second": self.prompts / elapsed,
+            "window": self.window,
+            "policies": {
+                name: {
+                    "hit_rate": cache.hit_rate(),
+                    "window_hit_rate": (self.recent_hits[name] / self.recent_accesses[name]
+                                        if self.recent_accesses[name] else 0.0),
+                }
+                for name, cache in self.caches.items()
+            },
+        }
+
+
+async def tail_file(path, queue, shadow, from_start=False, poll_interval=0.2):
+    """
+    Follow a logger file like `tail -F`: new lines go to the queue, and the
+    file is reopened when it is truncated or replaced (log rotation).
+    """
+    while not os.path.exists(path):
+        from_start = True       # everything in a file that appears later is new
+        await asyncio.sleep(poll_interval)
+    f = open(path, "r")
+    if not from_start:
+        f.seek(0, os.SEEK_END)
+    inode = os.fstat(f.fileno()).st_ino
+    partial = ""
+    try:
+        while True:
+            chunk = f.read(1 << 16)
+            if chunk:
+                lines = (partial + chunk).split("\n")
+                partial = lines.pop()   # last piece has no newline yet
+                for line in lines:
+                    await enqueue(line, queue, shadow)
+                await asyncio.sleep(0)  # let HTTP requests in between chunks of a long backlog
+                continue
+            await asyncio.sleep(poll_interval)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat.st_ino != inode or stat.st_size < f.tell():
+                f.close()
+                f = open(path, "r")
+                inode = os.fstat(f.fileno()).st_ino
+                partial = ""
+    finally:
+        f.close()
+
+
+async def serve_socket(path, queue, shadow):
+    """ Accept logger lines on a local (Unix) socket, one prompt per line """
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            await enqueue(line.decode(errors="replace"), queue, shadow)
+        writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle, path)
+    async with server:
+        await server.serve_forever()
+
+
+async def consume(queue, shadow, batch_size=256):
+    """
+    Drain the queue in batches and replay them on a single worker thread, so
+    the reader and the HTTP endpoint stay responsive while policies update.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=1) as worker:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            await loop.run_in_executor(worker, shadow.apply, batch)
+            for _ in batch:
+                queue.task_done()
+
+
+async def serve_http(shadow, queue, host, port):
+    async def handle(reader, writer):
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass                                    # skip headers
+        parts = request.decode(errors="replace").split()
+        path = parts[1] if len(parts) > 1 else "/"
+        if path in ("/", "/stats"):
+            body = shadow.snapshot()
+            body["backlog"] = queue.qsize()
+            status = "200 OK"
+        elif path == "/healthz":
+            body, status = {"ok": True}, "200 OK"
+        else:
+            body, status = {"error": f"unknown path {path}"}, "404 Not Found"
+        payload = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def main(args, max_size):
+    shadow = ShadowCaches(args.policies, max_size, args.window)
+    queue = asyncio.Queue(maxsize=args.max_backlog)     # full queue = reader waits, no prompt dropped
+    if args.socket:
+        source = serve_socket(args.socket, queue, shadow)
+    else:
+        source = tail_file(args.log_file, queue, shadow, args.from_start, args.poll_interval)
+    print(f"shadow policies {args.policies} at max_size {max_size}, "
+          f"stats on http://{args.host}:{args.port}/stats")
+    await asyncio.gather(source, consume(queue, shadow, args.batch_size),
+                         serve_http(shadow, queue, args.host, args.port))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow caches over the live vLLM content-hash log, what-if hit rates over HTTP")
+    parser.add_argument("--log_file", type=str, default="/Users/shenyang/Desktop/MS Research/workplace/data/vLLM_valid.txt", help="Logger output to follow, one prompt's block hashes per line")
+    parser.add_argument("--from_start", action="store_true", help="Replay the existing file content before following it")
+    parser.add_argument("--socket", type=str, default=None, help="Read lines from this Unix socket instead of a file")
+    parser.add_argument("--policies", type=str, nargs="+", default=["LRU", "DBL", "ARC"], choices=list(POLICIES))
+    parser.add_argument("--max_size", type=float, default=11170.23 / 16.0, help="Cache size in blocks (ignored with --model)")
+    parser.add_argument("--cp_ratio", type=float, default=1.0, help="Multiplier on the cache size, as in vLLM_validation.py")
+    parser.add_argument("--window", type=int, default=1000, help="Prompts in the rolling hit rate")
+    parser.add_argument("--batch_size", type=int, default=256, help="Prompts replayed per worker call")
+    parser.add_argument("--max_backlog", type=int, default=100000, help="Parsed prompts buffered before the reader waits")
+    parser.add_argument("--poll_interval", type=float, default=0.2, help="Seconds between checks of the file at EOF")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_capacity_args(parser)
+    args = parser.parse_args()
+
+    max_size = args.max_size * args.cp_ratio
+    if args.model is not None:
+        max_size = capacity_from_args(args) * args.cp_ratio
+    try:
+        asyncio.run(main(args, max_size))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,37 @@
+def replay(cache, data, monitor=None):
+    """
+    Feed a sampled trace to a cache the same way the experiment scripts do:
+    every prompt first looks up all of its blocks, then writes them back in
+    reverse order (the order vLLM frees a finished sequence's blocks).
+
+    If a `monitor` (see convergence.py) is given it is updated after every
+    prompt, and the replay stops as soon as it reports convergence.
+    """
+    for row in data:
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+        if monitor is not None and monitor.update(cache):
+            break
+    return cache.hit_rate()
+
+
+def replay_prompt_hits(cache, data, prefix=False):
+    """
+    Same as replay(), but returns the number of hit blocks of every prompt.
+    With `prefix=True` only the cached prefix is counted (the hits before the
+    first miss): vLLM stops its prefix-cache lookup at the first miss, so
+    that is what it reuses and what its num_cached_tokens reports.
+    """
+    prompt_hits = []
+    for row in data:
+        hits_before = cache.hit_count
+        cached_prefix, in_prefix = 0, True
+        for key, value in row:
+            in_prefix = cache.get(key) is not None and in_prefix
+            cached_prefix += in_prefix
+        for key, value in reversed(row):
+            cache.put(key, value)
+        prompt_hits.append(cached_prefix if prefix else cache.hit_count - hits_before)
+    return prompt_hits
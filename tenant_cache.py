@@ -0,0 +1,380 @@
+import argparse
+import math
+from collections import OrderedDict
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+MODES = ["shared", "static", "min_shared", "utility"]
+
+
+def resize(cache, max_size):
+    """ Change a policy's capacity in place, evicting down to it """
+    cache.max_size = math.ceil(max_size)
+    if isinstance(cache, DBLCachePQ):
+        cache.k = max(1, int(max_size * 0.5))
+    elif isinstance(cache, ARCCache):
+        cache.p = min(cache.p, cache.max_size)
+    while len(cache) > cache.max_size:
+        cache.evict()
+    if isinstance(cache, DBLCachePQ):
+        while len(cache.A1in_data) > cache.k:
+            cache._evict_from_A1in()
+    elif isinstance(cache, ARCCache):
+        # ARC's replacement assumes |T1| + |B1| <= c and a directory <= 2c;
+        # a shrunk c leaves too many ghosts behind and puts stop evicting
+        c = cache.max_size
+        while cache.B1 and len(cache.T1) + len(cache.B1) > c:
+            cache.B1.popitem(last=False)
+        while cache.B2 and len(cache.T1) + len(cache.T2) + len(cache.B1) + len(cache.B2) > 2 * c:
+            cache.B2.popitem(last=False)
+
+
+def split_capacity(capacity, weights):
+    """ Integer block counts proportional to `weights` that add up to `capacity` exactly (largest remainder) """
+    total = sum(weights)
+    exact = [int(capacity) * w / total for w in weights]
+    sizes = [int(x) for x in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - sizes[i], reverse=True)
+    for i in by_remainder[:int(capacity) - sum(sizes)]:
+        sizes[i] += 1
+    return sizes
+
+
+class HitCurveMonitor:
+    """
+    Hits that an LRU cache of each of `points` sizes (capacity * j / points)
+    would have had on one tenant's block references, as UCP's utility
+    monitors. Only keys whose hash falls under `sample_rate` are tracked, in
+    shadow LRUs scaled down by the same rate (SHARDS spatial sampling).
+    """
+    def __init__(self, capacity, points=16, sample_rate=0.1):
+        self.sample_rate = sample_rate
+        self.threshold = int(sample_rate * (1 << 32))
+        self.sizes = [max(1, round(capacity * j / points * sample_rate)) for j in range(1, points + 1)]
+        self.shadows = [OrderedDict() for _ in self.sizes]
+        self.hits = [0.0] * points
+
+    def access(self, key):
+        if (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFF >= self.threshold:
+            return
+        for j, shadow in enumerate(self.shadows):
+            if key in shadow:
+                shadow.move_to_end(key)
+                self.hits[j] += 1
+            else:
+                shadow[key] = None
+                if len(shadow) > self.sizes[j]:
+                    shadow.popitem(last=False)
+
+    def hit_curve(self):
+        """ Estimated hits with 0 .. points units of capacity """
+        return [0.0] + [h / self.sample_rate for h in self.hits]
+
+    def decay(self):
+        self.hits = [h / 2 for h in self.hits]
+
+
+def lookahead_partition(curves, total_units, min_units):
+    """
+    UCP lookahead allocation: starting from `min_units` each, repeatedly give
+    the tenant with the highest marginal utility per unit (over any number
+    of extra units) that many units. Ties go to the tenant holding fewer.
+    """
+    alloc = list(min_units)
+    balance = total_units - sum(alloc)
+    while balance > 0:
+        best = None
+        for t, curve in enumerate(curves):
+            cur = alloc[t]
+            for extra in range(1, min(balance, len(curve) - 1 - cur) + 1):
+                utility = (curve[cur + extra] - curve[cur]) / extra
+                if best is None or (utility, -alloc[t]) > (best[0], -alloc[best[1]]):
+                    best = (utility, t, extra)
+        if best is None:
+            break
+        _, t, extra = best
+        alloc[t] += extra
+        balance -= extra
+    return alloc
+
+
+class PartitionedCache:
+    """
+    Several tenants (or LoRA adapters, whose blocks never match across
+    adapters) in one KV pool of `capacity` blocks, each policy instance a
+    partition:
+
+    - `shared`: one policy for everyone, the noisy-neighbour baseline
+    - `static`: a private partition of quota * capacity per tenant
+    - `min_shared`: a private partition of min_share * capacity per tenant;
+      its evictions overflow into a shared policy holding the rest, where all
+      tenants compete. A hit there moves the block back on put(). Not for
+      DBL: overflow blocks would only ever enter its A1in (half the
+      overflow), since a hit takes them back out before they reach Am.
+    - `utility`: private partitions resized every `repartition_interval`
+      prompts by UCP lookahead over each tenant's hit curve (HitCurveMonitor),
+      in units of capacity / points, at least min_share * capacity each.
+
+    get/put take the tenant of the prompt; call end_prompt() after each
+    prompt (replay_tenants does).
+    """
+    def __init__(self, policy, capacity, tenants, mode="static", quotas=None, min_share=0.0,
+                 points=16, repartition_interval=200, sample_rate=0.1):
+        self.policy = POLICIES[policy]
+        self.capacity = capacity
+        self.tenants = list(tenants)
+        self.mode = mode
+        self.points = points
+        self.repartition_interval = repartition_interval
+        self.prompts = 0
+        self.owner = {}         # cached key -> tenant that inserted it (shared and overflow blocks)
+        self.partitions = {}
+        self.overflow = None
+        self.monitors = {}
+
+        n = len(self.tenants)
+        if mode == "shared":
+            self.overflow = self.policy(max_size=capacity)
+            self.overflow.on_evict = self._forget
+        elif mode == "static":
+            quotas = quotas or [1.0] * n
+            if len(quotas) != n:
+                raise ValueError(f"{len(quotas)} quotas for {n} tenants")
+            self._make_partitions(split_capacity(capacity, quotas))
+        elif mode == "min_shared":
+            if self.policy is DBLCachePQ:
+                raise ValueError("min_shared wastes half of a DBL overflow, use LRU, LFU or ARC")
+            if min_share * n >= 1:
+                raise ValueError(f"min_share {min_share} x {n} tenants leaves no shared overflow")
+            minimum = int(capacity * min_share)
+            self._make_partitions([minimum] * n)
+            for tenant, partition in self.partitions.items():
+                partition.on_evict = self._make_overflow(tenant)
+            self.overflow = self.policy(max_size=int(capacity) - minimum * n)
+            self.overflow.on_evict = self._forget
+        elif mode == "utility":
+            self.min_units = max(1, math.ceil(min_share * points))
+            if self.min_units * n > points:
+                raise ValueError(f"{n} tenants need at least {self.min_units * n} of {points} units")
+            self._make_partitions(split_capacity(capacity, [1] * n))
+            for tenant in self.tenants:
+                self.monitors[tenant] = HitCurveMonitor(capacity, points, sample_rate)
+        else:
+            raise ValueError(f"unknown mode {mode}")
+
+        self.hit_count = 0
+        self.access_count = 0
+        self.tenant_hits = dict.fromkeys(self.tenants, 0)
+        self.tenant_accesses = dict.fromkeys(self.tenants, 0)
+
+    def _make_partitions(self, sizes):
+        for tenant, size in zip(self.tenants, sizes):
+            if size < 2:
+                raise ValueError(f"tenant {tenant} gets {size} blocks, partitions need at least 2")
+            self.partitions[tenant] = self.policy(max_size=size)
+
+    def _forget(self, key, value):
+        self.owner.pop(key, None)
+
+    def _make_overflow(self, tenant):
+        def overflow(key, value):
+            self.owner[key] = tenant
+            self._put(self.overflow, key, value)
+        return overflow
+
+    @staticmethod
+    def _put(cache, key, value):
+        """ put() that holds a partition to its size, whatever its policy's own bookkeeping allows """
+        cache.put(key, value)
+        while len(cache) > cache.max_size:
+            cache.evict()
+
+    def get(self, key, tenant):
+        self.access_count += 1
+        self.tenant_accesses[tenant] += 1
+        if tenant in self.monitors:
+            self.monitors[tenant].access(key)
+        partition = self.partitions.get(tenant)
+        if partition is not None and key in partition:
+            value = partition.get(key)
+        elif self.overflow is not None and key in self.overflow:
+            value = self.overflow.get(key)
+        else:
+            return None
+        self.hit_count += 1
+        self.tenant_hits[tenant] += 1
+        return value
+
+    def put(self, key, value, tenant):
+        partition = self.partitions.get(tenant)
+        if partition is None:
+            self.owner.setdefault(key, tenant)
+            self._put(self.overflow, key, value)
+            return
+        if self.overflow is not None and key in self.overflow:
+            self.overflow.discard(key)  # reused: back into the tenant's own partition
+            self.owner.pop(key, None)
+        self._put(partition, key, value)
+
+    def end_prompt(self):
+        self.prompts += 1
+        if self.monitors and self.prompts % self.repartition_interval == 0:
+            self.repartition()
+
+    def repartition(self):
+        curves = [self.monitors[t].hit_curve() for t in self.tenants]
+        alloc = lookahead_partition(curves, self.points, [self.min_units] * len(self.tenants))
+        sizes = dict(zip(self.tenants, split_capacity(self.capacity, alloc)))
+        # shrink first, so the pool never holds more than its capacity
+        for tenant in sorted(self.tenants, key=lambda t: sizes[t] - len(self.partitions[t])):
+            resize(self.partitions[tenant], sizes[tenant])
+        for monitor in self.monitors.values():
+            monitor.decay()
+
+    def occupancy(self):
+        """ Blocks held per tenant (own partition plus the shared blocks it inserted) """
+        blocks = {tenant: len(self.partitions.get(tenant, ())) for tenant in self.tenants}
+        for tenant in self.owner.values():
+            blocks[tenant] += 1
+        return blocks
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+    def tenant_hit_rates(self):
+        return {t: self.tenant_hits[t] / self.tenant_accesses[t] if self.tenant_accesses[t] else 0.0
+                for t in self.tenants}
+
+
+def replay_tenants(cache, data):
+    """ simulate.replay for (tenant, row) prompts """
+    for tenant, row in data:
+        for key, value in row:
+            cache.get(key, tenant)
+        for key, value in reversed(row):
+            cache.put(key, value, tenant)
+        cache.end_prompt()
+    return cache.hit_rate()
+
+
+def fairness_report(cache):
+    """ Jain's index over per-tenant hit rates (1 = all equal) and the worst tenant """
+    rates = np.array(list(cache.tenant_hit_rates().values()))
+    jain = rates.sum() ** 2 / (len(rates) * (rates ** 2).sum()) if (rates ** 2).sum() > 0 else 1.0
+    return {"jain_index": float(jain), "min_hit_rate": float(rates.min()), "max_hit_rate": float(rates.max())}
+
+
+def read_tenant_data(path, isolate_keys=False):
+    """
+    Tenant-tagged content-hash trace: `@tenant hash hash ...` per prompt
+    (untagged lines belong to tenant "default"). With `isolate_keys` the
+    hashes are salted with the tenant, as for LoRA adapters.
+    """
+    data = []
+    with open(path, "r") as f:
+        for i, line in enumerate(f):
+            fields = line.split()
+            if not fields:
+                continue
+            tenant = "default"
+            if fields[0].startswith("@"):
+                tenant, fields = fields[0][1:], fields[1:]
+            keys = [int(num) for num in fields]
+            if isolate_keys:
+                keys = [hash((tenant, key)) for key in keys]
+            data.append((tenant, [(key, str(i + 1)) for key in keys]))
+    return data
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def tenant_workload(docs, tenants, noisy, sequence_length, alpha, noisy_share):
+    """
+    Each tenant draws from its own slice of the documents: regular tenants
+    by power law, noisy ones uniformly (mostly one-off documents) and
+    together `noisy_share` of all prompts.
+    """
+    names = [f"t{i}" for i in range(tenants)] + [f"noisy{i}" for i in range(noisy)]
+    slices = np.array_split(np.arange(len(docs)), len(names))
+    shares = [(1 - noisy_share) / tenants] * tenants + [noisy_share / noisy] * noisy if noisy else [1 / tenants] * tenants
+    owners = np.random.choice(len(names), size=sequence_length, p=shares)
+    data = []
+    for t in owners:
+        slice_ = slices[t]
+        if names[t].startswith("noisy"):
+            i = np.random.choice(slice_)
+        else:
+            p = np.arange(1, len(slice_) + 1) ** -alpha
+            i = np.random.choice(slice_, p=p / p.sum())
+        data.append((names[t], docs[i]))
+    return data, names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tenants sharing one KV pool: shared vs partitioned caches")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=1500, help="Numbers of prompts")
+    parser.add_argument("--policy", type=str, default="LRU", choices=list(POLICIES))
+    parser.add_argument("--modes", type=str, nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--trace", type=str, default=None, help="Tenant-tagged trace (`@tenant hash ...`) instead of the synthetic mix")
+    parser.add_argument("--isolate_keys", action="store_true", help="Blocks never match across tenants (LoRA adapters)")
+    parser.add_argument("--tenants", type=int, default=3, help="Regular tenants in the synthetic mix")
+    parser.add_argument("--noisy", type=int, default=1, help="Noisy tenants (uniform, one-off documents) in the synthetic mix")
+    parser.add_argument("--noisy_share", type=float, default=0.5, help="Share of prompts from noisy tenants")
+    parser.add_argument("--quotas", type=float, nargs="+", default=None, help="Static quota per tenant (normalised, default equal)")
+    parser.add_argument("--min_share", type=float, default=0.1, help="Capacity guaranteed to every tenant (min_shared, utility)")
+    parser.add_argument("--repartition_interval", type=int, default=100, help="Prompts between utility repartitions")
+    parser.add_argument("--points", type=int, default=32, help="Allocation units of the utility mode")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    max_size = int(668 / args.cache_size_fraction)
+    if args.trace is not None:
+        data = read_tenant_data(args.trace, args.isolate_keys)
+        tenants = list(dict.fromkeys(tenant for tenant, _ in data))
+    else:
+        data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+        docs = read_block_data_v3(data_path)[:]
+        data, tenants = tenant_workload(docs, args.tenants, args.noisy, args.sequence_length,
+                                        args.alpha, args.noisy_share)
+
+    result_filename = f"./result/tenant_cache_{args.policy}_alpha_{args.alpha}.csv"
+    with open(result_filename, "w") as f:
+        f.write("cache_size_fraction,mode,tenant,hitrate,blocks\n")
+        for mode in args.modes:
+            if mode == "min_shared" and args.policy == "DBL":
+                print("min_shared: skipped, not supported for DBL")
+                continue
+            cache = PartitionedCache(args.policy, max_size, tenants, mode, args.quotas, args.min_share,
+                                     args.points, args.repartition_interval)
+            replay_tenants(cache, tqdm(data, leave=False))
+            fairness = fairness_report(cache)
+            rates = cache.tenant_hit_rates()
+            blocks = cache.occupancy()
+            per_tenant = " ".join(f"{t} {rates[t]:.2%}/{blocks[t]}" for t in tenants)
+            print(f"{mode}: {args.policy} Hit Rate {cache.hit_rate():.2%}, Jain {fairness['jain_index']:.3f}, "
+                  f"worst {fairness['min_hit_rate']:.2%} [{per_tenant}]")
+            for t in tenants:
+                f.write(f"{args.cache_size_fraction},{mode},{t},{rates[t]:.4f},{blocks[t]}\n")
+            f.write(f"{args.cache_size_fraction},{mode},all,{cache.hit_rate():.4f},{sum(blocks.values())}\n")
@@ -0,0 +1,24 @@
+import random
+
+import cluster_sim
+from cluster_sim import simulate_cluster
+
+
+def trace(prompts, seed=0):
+    rng = random.Random(seed)
+    docs = [[(rng.getrandbits(62), str(i)) for i in range(rng.randint(1, 20))] for _ in range(50)]
+    return [docs[min(int(rng.paretovariate(1.0)) - 1, len(docs) - 1)] for _ in range(prompts)]
+
+
+def test_small_trace_replays_in_process(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("small trace started a process pool")
+    monkeypatch.setattr(cluster_sim, "ProcessPoolExecutor", no_pool)
+    stats, load = simulate_cluster(trace(200), "LRU", 4, 100, "round_robin")
+    assert sum(load) == sum(access for _, access in stats)
+
+
+def test_workers_do_not_change_the_result():
+    data = trace(200)
+    assert simulate_cluster(data, "ARC", 3, 100, "consistent_hash", workers=2) == \
+        simulate_cluster(data, "ARC", 3, 100, "consistent_hash", workers=1)
@@ -0,0 +1,20 @@
+import argparse
+
+import pytest
+
+from kv_capacity import add_capacity_args, capacity_from_args
+
+
+def parse(*argv):
+    parser = argparse.ArgumentParser()
+    add_capacity_args(parser)
+    return parser.parse_args(list(argv))
+
+
+def test_capacity_from_args():
+    assert capacity_from_args(parse("--model", "Qwen2.5-1.5B-Instruct", "--gpu_memory_gb", "24")) > 0
+
+
+def test_zero_block_capacity_is_rejected():
+    with pytest.raises(ValueError, match="0 KV blocks"):
+        capacity_from_args(parse("--model", "Mistral-7B-Instruct-v0.3", "--gpu_memory_gb", "8"))
@@ -0,0 +1,26 @@
+import random
+
+from pinned_prefix import PinnedPrefixCache, replay_pinned
+
+
+def test_pinned_set_is_closed_under_parents():
+    # a tiny sketch keeps its counts noisy, so its ranking need not follow the chains
+    rng = random.Random(0)
+    docs = [[(rng.getrandbits(62), str(i)) for i in range(rng.randint(1, 12))] for _ in range(200)]
+    data = [docs[min(int(rng.paretovariate(0.8)) - 1, len(docs) - 1)] for _ in range(3000)]
+    cache = PinnedPrefixCache("LRU", 300, pin_ratio=0.2, sketch_size=64, refresh_interval=25, min_count=2)
+    for start in range(0, len(data), 25):
+        replay_pinned(cache, data[start:start + 25])
+        assert cache.pin_set
+        assert len(cache.pin_set) <= cache.pin_capacity
+        for key in cache.pin_set:
+            assert cache.parent[key] is None or cache.parent[key] in cache.pin_set
+
+
+def test_unpinned_block_is_dropped():
+    cache = PinnedPrefixCache("LRU", 10, pin_ratio=0.2, sketch_size=16, refresh_interval=1, min_count=1)
+    replay_pinned(cache, [[(1, "a"), (2, "b")]] * 2)
+    assert cache.pin_set == {1, 2} and 1 in cache.pinned
+    replay_pinned(cache, [[(3, "c"), (4, "d")]] * 8)
+    assert 1 not in cache.pin_set
+    assert 1 not in cache
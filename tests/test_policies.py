@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from priority_cache import POLICIES
+
+
+@pytest.mark.parametrize("policy", list(POLICIES))
+def test_discard_and_evict_keep_the_policy_consistent(policy):
+    """ Random puts, lookups, discards and caller-driven evictions against a model of the resident set """
+    rng = random.Random(0)
+    cache = POLICIES[policy](max_size=50)
+    evicted = []
+    cache.on_evict = lambda key, value: evicted.append(key)
+    resident = set()
+    for step in range(20000):
+        key = rng.randrange(200)
+        op = rng.random()
+        if op < 0.7:
+            cache.get(key)
+            cache.put(key, str(key))
+            resident.add(key)
+        elif op < 0.85:
+            cache.discard(key)
+            resident.discard(key)
+            assert key not in cache
+        else:
+            victim = cache.evict()
+            assert (victim is None) == (not resident)
+        resident.difference_update(evicted)
+        evicted.clear()
+        assert len(cache) == len(resident) <= 50
+        assert all(k in cache for k in resident)
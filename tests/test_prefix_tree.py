@@ -0,0 +1,32 @@
+from cache.LRU_v2 import LRUCache
+from prefix_tree import PrefixTreeIndex
+
+
+def unreachable(index):
+    """ Cached blocks with an uncached ancestor, from the parent links """
+    found = set()
+    for key in index.parent:
+        if key not in index.cache:
+            continue
+        parent = index.parent[key]
+        while parent is not None:
+            if parent not in index.cache:
+                found.add(key)
+                break
+            parent = index.parent[parent]
+    return found
+
+
+def test_reput_interior_block_restores_its_other_branches():
+    # A-B-D and A-B-C share A-B; evicting B cuts off both branches
+    index = PrefixTreeIndex(LRUCache(max_size=10))
+    for chain in ("ABD", "ABC", "D", "C"):     # the last two leave B least recently used
+        index.process([(key, "v") for key in chain])
+    assert index.cache.evict() == "B"
+    index.process([("A", "v")])
+    assert index.orphans == {"C", "D"} == unreachable(index)
+
+    # A-B-C puts B back: D is reachable again through A-B, not only C
+    index.process([(key, "v") for key in "ABC"])
+    assert index.orphans == set() == unreachable(index)
+    assert index.report()["orphaned_blocks"] == 2
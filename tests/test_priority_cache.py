@@ -0,0 +1,32 @@
+import random
+
+import numpy as np
+import pytest
+
+from priority_cache import POLICIES, PriorityCache, priority_workload
+
+
+def mixed_trace(sequence_length=600, doc_blocks=8, num_docs=100, seed=1):
+    rng = random.Random(seed)
+    docs = [[(rng.getrandbits(40), str(i)) for _ in range(doc_blocks)] for i in range(num_docs)]
+    np.random.seed(seed)
+    return priority_workload(docs, sequence_length, alpha=1.0, batch_share=0.5, interactive_docs=0.3)
+
+
+@pytest.mark.parametrize("policy", list(POLICIES))
+@pytest.mark.parametrize("protect_prompts", [20, 500])
+def test_pool_stays_full_once_warm(policy, protect_prompts):
+    capacity = 500
+    cache = PriorityCache(policy, capacity, num_classes=2, aware=True, protect_prompts=protect_prompts)
+    warm = False
+    for priority, row in mixed_trace():
+        for key, value in row:
+            cache.get(key, priority)
+        for key, value in reversed(row):
+            cache.put(key, value, priority)
+        cache.end_prompt()
+        warm = warm or len(cache) == capacity
+        if warm:
+            assert len(cache) == capacity
+            assert sum(len(partition) for partition in cache.partitions) == capacity
+    assert warm
@@ -0,0 +1,27 @@
+import random
+
+from cache.radix_LRU import RadixLRUCache
+
+
+def replay(cache, data):
+    for row in data:
+        for key, value in row:
+            cache.get(key)
+        for key, value in reversed(row):
+            cache.put(key, value)
+
+
+def test_repeated_block_hash_keeps_the_tree_acyclic():
+    cache = RadixLRUCache(max_size=4)
+    replay(cache, [[("A", "v"), ("B", "v"), ("A", "v")], [("C", "v"), ("C", "v")]])
+    assert cache.parent["A"] is None and cache.parent["B"] == "A" and cache.parent["C"] is None
+    assert [cache.evict() for _ in range(3)] == ["B", "A", "C"]
+
+
+def test_size_bound_with_repeated_blocks():
+    rng = random.Random(0)
+    data = [[(rng.randrange(40), "v") for _ in range(rng.randint(1, 10))] for _ in range(2000)]
+    cache = RadixLRUCache(max_size=25)
+    for row in data:
+        replay(cache, [row])
+        assert len(cache) <= cache.max_size
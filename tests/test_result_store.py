@@ -0,0 +1,19 @@
+import importlib
+
+from result_store import ResultStore, cell_key, code_fingerprint
+
+
+def test_editing_a_policy_changes_its_cells(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    source = tmp_path / "toy_policy.py"
+    source.write_text("class ToyCache:\n    k = 1\n")
+    policy = importlib.import_module("toy_policy")
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    params = {"policy": "toy", "cache_size": 10, "code": code_fingerprint(policy.ToyCache)}
+    store.put(params, {"hit_rate": 0.5, "hit_count": 5, "access_count": 10})
+
+    source.write_text("class ToyCache:\n    k = 2\n")
+    edited = dict(params, code=code_fingerprint(policy.ToyCache))
+    assert cell_key(edited) != cell_key(params)
+    assert store.get(edited) is None and store.get(params)["hit_rate"] == 0.5
+    store.close()
@@ -0,0 +1,16 @@
+from cache.LRU_v2 import LRUCache
+from simulate import replay_prompt_hits
+
+TRACE = [
+    [(1, "a"), (2, "a"), (3, "a")],
+    [(9, "b"), (2, "b"), (3, "b")],     # hits after a miss
+    [(1, "c"), (2, "c"), (4, "c")],
+]
+
+
+def test_prompt_hits_count_every_hit_block():
+    assert replay_prompt_hits(LRUCache(max_size=10), TRACE) == [0, 2, 2]
+
+
+def test_prefix_hits_stop_at_the_first_miss():
+    assert replay_prompt_hits(LRUCache(max_size=10), TRACE, prefix=True) == [0, 0, 2]
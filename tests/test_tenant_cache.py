@@ -0,0 +1,35 @@
+import random
+
+import numpy as np
+import pytest
+
+from tenant_cache import MODES, POLICIES, PartitionedCache, tenant_workload
+
+
+def tenant_trace(sequence_length=1500, num_docs=300, seed=42):
+    rng = random.Random(seed)
+    docs = [[(rng.getrandbits(40), str(i)) for _ in range(rng.randint(20, 100))] for i in range(num_docs)]
+    np.random.seed(seed)
+    return tenant_workload(docs, tenants=3, noisy=1, sequence_length=sequence_length, alpha=1.0, noisy_share=0.5)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("policy", list(POLICIES))
+def test_partitions_stay_within_their_sizes(policy, mode):
+    data, tenants = tenant_trace()
+    capacity = 2000
+    try:
+        cache = PartitionedCache(policy, capacity, tenants, mode, min_share=0.1, points=32, repartition_interval=50)
+    except ValueError:
+        assert (policy, mode) == ("DBL", "min_shared")
+        return
+    caches = list(cache.partitions.values()) + ([cache.overflow] if cache.overflow is not None else [])
+    assert sum(c.max_size for c in caches) == capacity
+    for tenant, row in data:
+        for key, value in row:
+            cache.get(key, tenant)
+        for key, value in reversed(row):
+            cache.put(key, value, tenant)
+        cache.end_prompt()
+        for c in caches:
+            assert len(c) <= c.max_size
@@ -0,0 +1,35 @@
+import pytest
+
+from cache.ARC import ARCCache
+from cache.LFU import LFUCache
+from cache.LRU_v2 import LRUCache
+from simulate import replay
+from tiered_cache import TieredCache
+
+
+@pytest.mark.parametrize("cpu_policy", [ARCCache, LFUCache])
+def test_exclusive_swap_cycle_is_not_a_reference(cpu_policy):
+    """
+    Swapping a block in from an exclusive CPU tier and demoting it again
+    must not leave it in the CPU policy's in_use set (the pinning state of
+    remove()), or the second demotion counts as a reference.
+    """
+    cache = TieredCache(LRUCache(max_size=2), cpu_policy(max_size=4), block_bytes=1)
+    replay(cache, [[(key, str(key))] for key in (1, 2, 3, 1, 4, 5)])
+    assert not cache.cpu.in_use
+    if cpu_policy is ARCCache:
+        assert 1 in cache.cpu.T1 and 1 not in cache.cpu.T2
+    else:
+        assert cache.cpu.data[1][1] == 1
+
+
+@pytest.mark.parametrize("cpu_policy", [ARCCache, LFUCache])
+def test_inclusive_demotion_of_a_host_copy_is_not_a_reference(cpu_policy):
+    """ A block demoted again while its host copy is still on the CPU tier leaves the CPU policy untouched """
+    cache = TieredCache(LRUCache(max_size=2), cpu_policy(max_size=4), block_bytes=1, inclusive=True)
+    replay(cache, [[(key, str(key))] for key in (1, 2, 3, 1, 4, 5)])
+    assert cache.swap_out_count == 3
+    if cpu_policy is ARCCache:
+        assert 1 in cache.cpu.T1 and 1 not in cache.cpu.T2
+    else:
+        assert cache.cpu.data[1][1] == 1
@@ -0,0 +1,16 @@
+from serving_sim import read_block_data_v3
+from token_hashing import convert
+
+
+def test_short_requests_keep_the_trace_aligned(tmp_path):
+    requests = tmp_path / "requests.txt"
+    requests.write_text("1 2 3 4\n5\n1 2 3 4 6 7\n5\n")
+    trace = tmp_path / "trace.txt"
+    assert convert(str(requests), str(trace), block_size=2, workers=1, batch_size=2) == 4
+
+    rows = [[key for key, _ in row] for row in read_block_data_v3(str(trace))]
+    assert [len(row) for row in rows] == [2, 1, 3, 1]
+    assert rows[2][:2] == rows[0]
+    # identical short requests still get distinct placeholders: they never hit
+    assert rows[1][0] != rows[3][0]
+    assert len({key for row in rows for key in row}) == 5
@@ -0,0 +1,20 @@
+import os
+
+from ttft_model import PrefillCostModel, attention_share, prefill_block_cost
+
+CALIBRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "view_exp_result", "Qwen2.5-1.5B-Instruct_wikiQA_hotspot.csv")
+
+
+def test_attention_share_keeps_the_fitted_prefill_cost():
+    flat = PrefillCostModel.from_hitrate_csv(CALIBRATION, 2048)
+    model = PrefillCostModel.from_hitrate_csv(CALIBRATION, 2048, attention_share("Qwen2.5-1.5B-Instruct", 2048))
+    assert abs(model.cumulative_time(2048) - flat.cumulative_time(2048)) < 1e-9
+    assert model.overhead == flat.overhead
+
+
+def test_default_block_cost_grows_with_position():
+    model = PrefillCostModel.from_hitrate_csv(CALIBRATION, 2048, attention_share("Qwen2.5-1.5B-Instruct", 2048))
+    cost = prefill_block_cost(model)
+    assert cost(0, 1) < cost(10, 1) < cost(100, 1)
+    assert cost(10, 3) == 3 * cost(10, 1)
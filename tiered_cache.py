@@ -0,0 +1,155 @@
+import argparse
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from kv_capacity import MODEL_PRESETS, kv_bytes_per_block
+from simulate import replay
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+}
+
+
+class TieredCache:
+    """
+    GPU blocks backed by a CPU offload pool, each tier run by its own policy.
+
+    - Blocks evicted from the GPU policy are demoted (copied to host memory)
+      into the CPU policy; with `demote="reused"` only blocks that were hit at
+      least once on the GPU are worth the copy.
+    - A lookup that misses the GPU but hits the CPU swaps the block back in
+      instead of recomputing it. With `inclusive=False` the block leaves the
+      CPU tier when promoted, otherwise the host copy stays.
+    - Every transfer costs `pcie_latency + block_bytes / pcie_bandwidth`.
+
+    Exposes the usual get/put/hit_rate interface, so the existing drivers work.
+    """
+
+    def __init__(self, gpu_cache, cpu_cache, block_bytes, pcie_bandwidth_gbps=25.0,
+                 pcie_latency_us=10.0, inclusive=False, demote="all"):
+        self.gpu = gpu_cache
+        self.cpu = cpu_cache
+        self.block_bytes = block_bytes
+        self.transfer_time = pcie_latency_us * 1e-6 + block_bytes / (pcie_bandwidth_gbps * 1e9)
+        self.inclusive = inclusive
+        self.demote = demote
+        self.gpu.on_evict = self._demote
+
+        self.gpu_reused = set()     # GPU resident keys hit since their insertion
+        self.hit_count = 0
+        self.access_count = 0
+        self.gpu_hit_count = 0
+        self.cpu_hit_count = 0
+        self.swap_in_count = 0
+        self.swap_out_count = 0
+
+    def get(self, key):
+        self.access_count += 1
+        if key in self.gpu:
+            self.gpu_hit_count += 1
+            self.hit_count += 1
+            self.gpu_reused.add(key)
+            return self.gpu.get(key)
+        value = self.cpu.get(key)
+        if value is not None:
+            self.cpu_hit_count += 1
+            self.hit_count += 1
+            self.swap_in_count += 1
+        return value
+
+    def put(self, key, value):
+        if key not in self.gpu and not self.inclusive:
+            self.cpu.discard(key)   # promoted: the host copy is released (not pinned)
+        self.gpu.put(key, value)
+
+    def _demote(self, key, value):
+        reused = key in self.gpu_reused
+        self.gpu_reused.discard(key)
+        if self.demote == "reused" and not reused:
+            return
+        if key in self.cpu:
+            return      # host copy still valid; a put() would count as a CPU-tier reference
+        self.swap_out_count += 1
+        self.cpu.put(key, value)
+
+    def hit_rate(self):
+        return self.hit_count / self.access_count if self.access_count > 0 else 0.0
+
+    def report(self):
+        access = max(1, self.access_count)
+        return {
+            "hit_rate": self.hit_rate(),
+            "gpu_hit_rate": self.gpu_hit_count / access,
+            "cpu_hit_rate": self.cpu_hit_count / access,
+            "swap_in_seconds": self.swap_in_count * self.transfer_time,
+            "swap_out_seconds": self.swap_out_count * self.transfer_time,
+            "swap_in_blocks": self.swap_in_count,
+            "swap_out_blocks": self.swap_out_count,
+        }
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(num_elements, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-tier GPU/CPU KV cache simulation")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of the GPU cache occupied by one data entry")
+    parser.add_argument("--cpu_ratio", type=float, default=4.0, help="CPU tier size as a multiple of the GPU tier")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--gpu_policy", type=str, default="ARC", choices=list(POLICIES))
+    parser.add_argument("--cpu_policy", type=str, default="LRU", choices=list(POLICIES))
+    parser.add_argument("--inclusive", action="store_true", help="Keep the host copy when a block is swapped in")
+    parser.add_argument("--demote", type=str, default="all", choices=["all", "reused"], help="Which GPU evictions are copied to the CPU tier")
+    parser.add_argument("--model", type=str, default="Qwen2.5-1.5B-Instruct", choices=list(MODEL_PRESETS), help="Model whose block size is transferred")
+    parser.add_argument("--block_size", type=int, default=16, help="Tokens per KV block")
+    parser.add_argument("--pcie_bandwidth_gbps", type=float, default=25.0, help="Effective host<->device bandwidth in GB/s")
+    parser.add_argument("--pcie_latency_us", type=float, default=10.0, help="Per-transfer latency in microseconds")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    gpu_blocks = int(668 / args.cache_size_fraction)
+    cpu_blocks = int(gpu_blocks * args.cpu_ratio)
+    data = read_block_data_v3(data_path)[:]
+    data = power_law_sampling(len(data), sequence_length=args.sequence_length, exponent=args.alpha)
+
+    spec = MODEL_PRESETS[args.model]
+    block_bytes = kv_bytes_per_block(spec["num_layers"], spec["num_kv_heads"], spec["head_dim"],
+                                     spec["dtype"], args.block_size)
+
+    gpu_only = POLICIES[args.gpu_policy](max_size=gpu_blocks)
+    replay(gpu_only, data)
+    print(f"{args.gpu_policy} GPU only Hit Rate: {gpu_only.hit_rate():.2%}")
+
+    cache = TieredCache(POLICIES[args.gpu_policy](max_size=gpu_blocks),
+                        POLICIES[args.cpu_policy](max_size=cpu_blocks), block_bytes,
+                        args.pcie_bandwidth_gbps, args.pcie_latency_us, args.inclusive, args.demote)
+    replay(cache, tqdm(data))
+    report = cache.report()
+    print(f"{args.gpu_policy}+{args.cpu_policy} Hit Rate: {report['hit_rate']:.2%} "
+          f"(GPU {report['gpu_hit_rate']:.2%}, CPU {report['cpu_hit_rate']:.2%}), "
+          f"swap-in {report['swap_in_blocks']} blocks / {report['swap_in_seconds']:.3f}s, "
+          f"swap-out {report['swap_out_blocks']} blocks / {report['swap_out_seconds']:.3f}s")
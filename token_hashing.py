@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+
+def sha256_hash(obj):
+    """ vLLM's `sha256` prefix-caching hash: SHA-256 of the pickled input as an int """
+    return int.from_bytes(hashlib.sha256(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)).digest(), "big")
+
+
+HASH_FUNCTIONS = {
+    "sha256": sha256_hash,
+    "builtin": hash,
+}
+
+
+def none_hash(hash_fn, seed=None):
+    """
+    Parent hash of every request's first block. vLLM uses hash_fn(PYTHONHASHSEED),
+    or 32 random bytes when that is unset (then no two runs share hashes).
+    """
+    if seed is None:
+        return int.from_bytes(os.urandom(32), "big")
+    return hash_fn(seed)
+
+
+def block_extra_keys(block_index, lora_name=None, cache_salt=None):
+    """ Extra keys of one block as vLLM builds them: LoRA name on every block, cache salt on the first """
+    keys = ()
+    if lora_name is not None:
+        keys += (lora_name,)
+    if cache_salt is not None and block_index == 0:
+        keys += (cache_salt,)
+    return keys or None
+
+
+def hash_request_tokens(token_ids, block_size, hash_fn, root_hash, lora_name=None, cache_salt=None):
+    """
+    Chained hashes of the full blocks of one request, as in vLLM's
+    hash_block_tokens: hash((parent_hash, block_token_ids, extra_keys)),
+    the first block's parent being `root_hash`. A trailing partial block is
+    never cached and gets no hash.
+    """
+    num_blocks = len(token_ids) // block_size
+    if num_blocks == 0:
+        return []
+    blocks = np.asarray(token_ids[:num_blocks * block_size], dtype=np.int64).reshape(num_blocks, block_size).tolist()
+    hashes = []
+    parent = root_hash
+    for i, block in enumerate(blocks):
+        parent = hash_fn((parent, tuple(block), block_extra_keys(i, lora_name, cache_salt)))
+        hashes.append(parent)
+    return hashes
+
+
+def parse_request(line, field="prompt_token_ids"):
+    """
+    One request -> (token_ids, lora_name, cache_salt). JSONL lines are
+    objects with the token IDs under `field` and optional `lora_name` and
+    `cache_salt`; any other line is whitespace-separated token IDs.
+    """
+    if line.startswith("{"):
+        request = json.loads(line)
+        return request[field], request.get("lora_name"), request.get("cache_salt")
+    return [int(tok) for tok in line.split()], None, None
+
+
+def hash_batch(lines, block_size, hash_name, root_hash, field="prompt_token_ids", first_index=0):
+    """
+    Worker entry point: raw request lines -> one trace line each (parsing
+    happens here, off the reader). A request without a full block gets one
+    placeholder hash, unique to its index, in place of an empty line: the
+    trace readers drop empty lines, which would shift every later prompt
+    against the request log. Like vLLM's uncached partial block, it takes
+    one block and never hits.
+    """
+    hash_fn = HASH_FUNCTIONS[hash_name]
+    out = []
+    for i, line in enumerate(lines):
+        token_ids, lora_name, cache_salt = parse_request(line, field)
+        hashes = hash_request_tokens(token_ids, block_size, hash_fn, root_hash, lora_name, cache_salt)
+        if not hashes:
+            hashes = [hash_fn((root_hash, "partial", first_index + i))]
+        out.append(" ".join(map(str, hashes)))
+    return out
+
+
+def read_request_lines(path):
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def batched(iterable, batch_size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def convert(input_path, output_path, block_size=16, hash_name="sha256", seed="0",
+            field="prompt_token_ids", workers=None, batch_size=256):
+    """
+    Token-ID request log -> content-hash trace (one prompt per line, as
+    vLLM_valid.txt), hashing batches of requests across a process pool.
+    At most 2 batches per worker are in flight, so the input is streamed.
+    Returns the number of prompts written.
+    """
+    root_hash = none_hash(HASH_FUNCTIONS[hash_name], seed)
+    workers = workers or os.cpu_count()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_path, "w") as out:
+        pending = []
+        submitted = 0
+        for batch in tqdm(batched(read_request_lines(input_path), batch_size), unit="batch"):
+            pending.append(pool.submit(hash_batch, batch, block_size, hash_name, root_hash, field, submitted))
+            submitted += len(batch)
+            if len(pending) >= 2 * workers:
+                lines = pending.pop(0).result()
+                out.write("".join(line + "\n" for line in lines))
+                written += len(lines)
+        for future in pending:
+            lines = future.result()
+            out.write("".join(line + "\n" for line in lines))
+            written += len(lines)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="vLLM-compatible chained block hashes from token-ID request logs")
+    parser.add_argument("--input", type=str, required=True, help="JSONL requests or one whitespace-separated token-ID sequence per line")
+    parser.add_argument("--output", type=str, default="/Users/shenyang/Desktop/MS Research/workplace/data/token_trace.txt", help="Content-hash trace to write")
+    parser.add_argument("--field", type=str, default="prompt_token_ids", help="JSONL field holding the token IDs")
+    parser.add_argument("--block_size", type=int, default=16, help="Tokens per KV block")
+    parser.add_argument("--hash", type=str, default="sha256", choices=list(HASH_FUNCTIONS), help="vLLM --prefix-caching-hash-algo")
+    parser.add_argument("--seed", type=str, default="0", help="PYTHONHASHSEED of the emulated vLLM (root of every hash chain)")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: all cores)")
+    parser.add_argument("--batch_size", type=int, default=256, help="Requests per worker task")
+    args = parser.parse_args()
+
+    if args.hash == "builtin" and os.environ.get("PYTHONHASHSEED") is None:
+        print("warning: builtin hash of str extra keys (LoRA names, cache salts) differs between processes "
+              "unless PYTHONHASHSEED is set")
+    written = convert(args.input, args.output, args.block_size, args.hash, args.seed,
+                      args.field, args.workers, args.batch_size)
+    print(f"{written} prompts written to {args.output}")
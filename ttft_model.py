@@ -0,0 +1,225 @@
+import argparse
+import csv
+
+import numpy as np
+from tqdm import tqdm
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LFU import LFUCache
+from cache.GDSF import GDSFCache, block_cost
+from kv_capacity import MODEL_PRESETS
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+    "GDSF": GDSFCache,
+}
+
+
+class PrefillCostModel:
+    """
+    Prefill latency as a function of how many tokens are computed.
+
+    `tokens`/`seconds` sample the curve T(n): the time to prefill a prompt of n
+    tokens from scratch (measured, so the attention cost growing with the
+    context is included). A prompt of n tokens whose first h tokens come from
+    the prefix cache costs T(n) - T(h) GPU-seconds, and its TTFT is that plus
+    a fixed `overhead` (scheduling, sampling the first token). T is linear
+    between the points and extrapolated with the last slope, plus
+    `quadratic * n^2` for an attention cost the samples do not capture
+    (a fitted constant cost per token).
+    """
+
+    def __init__(self, tokens, seconds, overhead=0.0, quadratic=0.0):
+        order = np.argsort(tokens)
+        self.tokens = np.concatenate([[0.0], np.asarray(tokens, dtype=float)[order]])
+        self.seconds = np.concatenate([[0.0], np.asarray(seconds, dtype=float)[order]])
+        self.overhead = overhead
+        self.quadratic = quadratic
+
+    def cumulative_time(self, n):
+        if n <= self.tokens[-1]:
+            linear = float(np.interp(n, self.tokens, self.seconds))
+        else:
+            slope = (self.seconds[-1] - self.seconds[-2]) / (self.tokens[-1] - self.tokens[-2])
+            linear = float(self.seconds[-1] + slope * (n - self.tokens[-1]))
+        return linear + self.quadratic * n * n
+
+    def prefill_time(self, total_tokens, cached_tokens):
+        """ GPU-seconds spent on the tokens that missed the cache """
+        return self.cumulative_time(total_tokens) - self.cumulative_time(cached_tokens)
+
+    def ttft(self, total_tokens, cached_tokens):
+        return self.overhead + self.prefill_time(total_tokens, cached_tokens)
+
+    @classmethod
+    def from_curve_csv(cls, path, overhead=0.0):
+        """ A prefill benchmark with columns `tokens,seconds` """
+        with open(path, "r") as f:
+            rows = list(csv.DictReader(f))
+        return cls([float(r["tokens"]) for r in rows], [float(r["seconds"]) for r in rows], overhead)
+
+    @classmethod
+    def from_hitrate_csv(cls, path, prompt_tokens, attention_share=0.0):
+        """
+        Calibrate from a vLLM sweep such as view_exp_result/*.csv, where every
+        `<POLICY>_hitrate` column has a matching `<POLICY>_time` column
+        (mean request latency). Fits time = overhead + cost * (1 - hit_rate)
+        over all policies and cache sizes, the cost of a full prefill of
+        `prompt_tokens` tokens (the mean prompt length). The sweep cannot
+        tell where that cost is spent: `attention_share` of it goes to a
+        quadratic attention term (see attention_share()), the rest is a
+        constant cost per token. With 0 a token costs the same at every
+        position.
+        """
+        with open(path, "r") as f:
+            rows = list(csv.DictReader(f))
+        policies = [c[:-len("_hitrate")] for c in rows[0] if c.endswith("_hitrate")]
+        miss = [1.0 - float(r[p + "_hitrate"]) for r in rows for p in policies]
+        times = [float(r[p + "_time"]) for r in rows for p in policies]
+        cost, overhead = np.polyfit(miss, times, 1)
+        cost = max(cost, 0.0)
+        return cls([prompt_tokens], [cost * (1.0 - attention_share)], overhead=max(overhead, 0.0),
+                   quadratic=cost * attention_share / prompt_tokens ** 2)
+
+
+def attention_share(model, prompt_tokens):
+    """
+    Share of a `prompt_tokens` prefill's FLOPs spent in attention for a
+    MODEL_PRESETS model: the token at position i costs 2 * num_params for
+    the weight matmuls and 4 * num_layers * hidden_size * i for QK^T and AV,
+    so over the prompt attention is L*d*n / (P + L*d*n).
+    """
+    spec = MODEL_PRESETS[model] if isinstance(model, str) else model
+    attention = spec["num_layers"] * spec["hidden_size"] * prompt_tokens
+    return attention / (spec["num_params"] + attention)
+
+
+def prefill_block_cost(model, block_size=16):
+    """
+    GDSFCache cost function from a prefill model: recomputing the block at
+    `position` costs T((position + 1) * block_size) - T(position * block_size),
+    once for every document sharing it. Only a model with a quadratic term
+    (or a measured curve) makes this grow with the position; a fitted
+    constant cost per token leaves fan_out as the only difference.
+    """
+    def cost_fn(position, fan_out):
+        return fan_out * model.prefill_time((position + 1) * block_size, position * block_size)
+    return cost_fn
+
+
+def replay_saved_prefill(cache, data, model, block_size=16):
+    """
+    simulate.replay_prompt_hits that also credits every hit block with the
+    prefill compute it saves at its position in the prompt. Unlike the
+    prefix accounting of ttft_report, hits need not be contiguous, so this is
+    what a cost-aware policy should be judged on.
+    Returns (hit blocks per prompt, cached prefix blocks per prompt, saved GPU-seconds).
+    """
+    block_saving = []
+    prompt_hits, prefix_hits, saved = [], [], 0.0
+    for row in data:
+        while len(block_saving) < len(row):
+            position = len(block_saving)
+            block_saving.append(model.prefill_time((position + 1) * block_size, position * block_size))
+        hits, prefix = 0, 0
+        for position, (key, value) in enumerate(row):
+            if cache.get(key) is not None:
+                hits += 1
+                saved += block_saving[position]
+                prefix += hits == position + 1
+        for key, value in reversed(row):
+            cache.put(key, value)
+        prompt_hits.append(hits)
+        prefix_hits.append(prefix)
+    return prompt_hits, prefix_hits, saved
+
+
+def ttft_report(prefix_hits, data, model, block_size=16):
+    """
+    TTFT percentiles and prefill compute of one policy's replay, from the
+    cached prefix of every prompt (simulate.replay_prompt_hits with
+    prefix=True): vLLM recomputes everything after the first miss, even
+    blocks that are still cached.
+    """
+    ttfts, compute = [], 0.0
+    for hits, row in zip(prefix_hits, data):
+        total, cached = len(row) * block_size, hits * block_size
+        compute += model.prefill_time(total, cached)
+        ttfts.append(model.ttft(total, cached))
+    no_cache = sum(model.prefill_time(len(row) * block_size, 0) for row in data)
+    return {
+        "ttft_mean": float(np.mean(ttfts)),
+        "ttft_p50": float(np.percentile(ttfts, 50)),
+        "ttft_p90": float(np.percentile(ttfts, 90)),
+        "ttft_p99": float(np.percentile(ttfts, 99)),
+        "prefill_gpu_seconds": compute,
+        "saved_gpu_seconds": no_cache - compute,
+    }
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def power_law_sampling(num_elements, sequence_length=1500, exponent=1.0):
+    values = np.arange(1, num_elements + 1)
+    probabilities = values ** -exponent
+    probabilities /= probabilities.sum()
+    sampled_indices = np.random.choice(values - 1, size=sequence_length, p=probabilities)
+    return [data[i] for i in sampled_indices]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TTFT and prefill compute per policy")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Exponent for power law sampling")
+    parser.add_argument("--cache_size_fraction", type=float, default=0.1, help="Fraction of cache occupied by one data entry")
+    parser.add_argument("--sequence_length", type=int, default=800, help="Numbers of prompts")
+    parser.add_argument("--block_size", type=int, default=16, help="Tokens per KV block")
+    parser.add_argument("--prefill_curve", type=str, default=None, help="CSV with columns tokens,seconds")
+    parser.add_argument("--calibrate_from", type=str, default="./view_exp_result/Qwen2.5-1.5B-Instruct_wikiQA_hotspot.csv", help="vLLM sweep CSV with <POLICY>_hitrate/<POLICY>_time columns")
+    parser.add_argument("--calib_prompt_tokens", type=float, default=2048, help="Mean prompt length (tokens) of the calibration sweep")
+    parser.add_argument("--calib_model", type=str, default="Qwen2.5-1.5B-Instruct", choices=list(MODEL_PRESETS), help="Model of the calibration sweep, sets the attention share of the fitted cost")
+    parser.add_argument("--overhead", type=float, default=0.0, help="Fixed TTFT overhead for --prefill_curve")
+    parser.add_argument("--policies", type=str, nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--gdsf_cost", type=str, default="prefill_model", choices=["prefill_model", "analytic"], help="GDSF block cost: from the prefill model, or cache.GDSF.block_cost")
+    args = parser.parse_args()
+
+    if args.prefill_curve:
+        model = PrefillCostModel.from_curve_csv(args.prefill_curve, args.overhead)
+    else:
+        model = PrefillCostModel.from_hitrate_csv(args.calibrate_from, args.calib_prompt_tokens,
+                                                  attention_share(args.calib_model, args.calib_prompt_tokens))
+    print(f"prefill model: overhead {model.overhead * 1000:.2f} ms, "
+          f"{model.prefill_time(1024, 0) * 1000:.2f} ms for the first 1k tokens, "
+          f"{model.prefill_time(4096, 3072) * 1000:.2f} ms for tokens 3k-4k")
+
+    np.random.seed(42)
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/artificial_docs.txt"
+    max_size = int(668 / args.cache_size_fraction)
+    data = read_block_data_v3(data_path)[:]
+    data = power_law_sampling(len(data), sequence_length=args.sequence_length, exponent=args.alpha)
+
+    for name in tqdm(args.policies):
+        if name == "GDSF":
+            cost_fn = prefill_block_cost(model, args.block_size) if args.gdsf_cost == "prefill_model" else block_cost
+            cache = GDSFCache(max_size=max_size, cost_fn=cost_fn)
+        else:
+            cache = POLICIES[name](max_size=max_size)
+        prompt_hits, prefix_hits, block_saved = replay_saved_prefill(cache, data, model, args.block_size)
+        report = ttft_report(prefix_hits, data, model, args.block_size)
+        prefix_share = sum(prefix_hits) / max(1, sum(prompt_hits))
+        print(f"{name}Cache Hit Rate: {cache.hit_rate():.2%}, TTFT mean {report['ttft_mean'] * 1000:.1f} ms, "
+              f"p50 {report['ttft_p50'] * 1000:.1f} ms, p90 {report['ttft_p90'] * 1000:.1f} ms, "
+              f"p99 {report['ttft_p99'] * 1000:.1f} ms, prefill {report['prefill_gpu_seconds']:.1f} GPU-s "
+              f"(saved {report['saved_gpu_seconds']:.1f}, per hit block {block_saved:.1f}), "
+              f"{prefix_share:.2%} of hit blocks in the cached prefix")
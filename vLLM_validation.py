@@ -7,7 +7,9 @@ from cache.two_q import TwoQCache
 from cache.ARC import ARCCache
 from cache.ARC_PQ import ARCCachePQ
 from cache.DBL_PQ import DBLCachePQ
+from cache.LIRS import LIRSCache
 from cache_sequence.ARC_timestamp import ARCTimestampCache
+from kv_capacity import add_capacity_args, capacity_from_args
 
 def read_block_data_v3(path):
     with open(path, "r") as f:
@@ -26,7 +28,9 @@ def read_block_data_v3(path):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test LRUCache and TwoQCache")
     parser.add_argument("--cp_ratio", type=float, default=1.0, help="Exponent for power law sampling")
-    cp_ratio = parser.parse_args().cp_ratio
+    add_capacity_args(parser)
+    args = parser.parse_args()
+    cp_ratio = args.cp_ratio
     np.random.seed(42)
     data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/vLLM_valid.txt"
     data = read_block_data_v3(data_path)[:]
@@ -41,6 +45,8 @@ if __name__ == "__main__":
     max_size = 193.80 / 16.0 * cp_ratio     # mistral
     max_size = 11350.43 / 16.0 * cp_ratio     # SmolLM2-360M-Instruct
     max_size = 11170.23 / 16.0 * cp_ratio     # Qwen2.5-1.5B-Instruct
+    if args.model is not None:
+        max_size = capacity_from_args(args) * cp_ratio
     print("max_size for cache:", max_size)
     k_value = int(max_size * 0.25)
     lru_cache = LRUCache(max_size=max_size)
@@ -91,6 +97,14 @@ if __name__ == "__main__":
             arc_cache.put(key, value)
             # print(f"Step {idx+1} ARCCache T1: {len(arc_cache.T1)}, T2: {len(arc_cache.T2)}, B1: {len(arc_cache.B1)}, B2: {len(arc_cache.B2)}, p: {arc_cache.p}")
     print(f"ARCCache Hit Rate: {arc_cache.hit_rate():.2%}")
+
+    lirs_cache = LIRSCache(max_size=max_size)
+    for idx, row in enumerate(tqdm(data)):
+        for key, value in row:
+            lirs_cache.get(key)
+        for key, value in reversed(row):
+            lirs_cache.put(key, value)
+    print(f"LIRSCache Hit Rate: {lirs_cache.hit_rate():.2%}")
     
     # arc_pq_cache = ARCCachePQ(max_size=max_size)
     # for idx, row in enumerate(tqdm(data)):
@@ -0,0 +1,170 @@
+import argparse
+import math
+
+import numpy as np
+
+from cache.LRU_v2 import LRUCache
+from cache.ARC import ARCCache
+from cache.DBL_PQ import DBLCachePQ
+from cache.LIRS import LIRSCache
+from kv_capacity import add_capacity_args, capacity_from_args
+from simulate import replay_prompt_hits
+
+POLICIES = {
+    "LRU": LRUCache,
+    "DBL": DBLCachePQ,
+    "ARC": ARCCache,
+    "LIRS": LIRSCache,
+}
+
+
+def read_block_data_v3(path):
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f.readlines()]
+
+    data = [[(int(num), str(i + 1)) for num in line.split()]
+            for i, line in enumerate(lines) if line]
+    return data
+
+
+def read_vllm_hits(path, data, unit="blocks", block_size=16):
+    """
+    Hit counts measured by vLLM, one line per prompt in the same order as the
+    content-hash log: `hits` or `hits total`, in blocks or (unit="tokens",
+    e.g. num_cached_tokens) in tokens. Without a total the prompt's block
+    count from the log is used. Returns (hits, totals) per prompt and the
+    number of prompts whose total disagrees with the log.
+    """
+    with open(path, "r") as f:
+        rows = [line.split() for line in f if line.strip()]
+    if len(rows) != len(data):
+        raise ValueError(f"{path} has {len(rows)} prompts, the content-hash log has {len(data)}")
+    hits, totals, mismatched = [], [], 0
+    for fields, row in zip(rows, data):
+        values = [int(float(v)) for v in fields[:2]]
+        if unit == "tokens":
+            values = [values[0] // block_size] + [math.ceil(v / block_size) for v in values[1:]]
+        total = values[1] if len(values) > 1 else len(row)
+        if total != len(row):
+            mismatched += 1
+        hits.append(min(values[0], total))
+        totals.append(total)
+    return np.array(hits), np.array(totals), mismatched
+
+
+def windowed_hit_rates(hits, totals, window):
+    """ Hit rate of every block of `window` consecutive prompts (the last one may be shorter) """
+    starts = np.arange(0, len(hits), window)
+    window_hits = np.add.reduceat(hits, starts)
+    window_totals = np.add.reduceat(totals, starts)
+    return starts, window_hits / np.maximum(window_totals, 1)
+
+
+def divergence_points(starts, errors, threshold, window):
+    """ Prompt ranges [start, end) of consecutive windows whose absolute error exceeds `threshold` """
+    ranges = []
+    for start, error in zip(starts, errors):
+        if error <= threshold:
+            continue
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = start + window
+            ranges[-1][2] = max(ranges[-1][2], error)
+        else:
+            ranges.append([start, start + window, error])
+    return [tuple(r) for r in ranges]
+
+
+def fidelity(policy, data, max_size, vllm_hits, totals, window):
+    """
+    Simulated vs measured hit rates, cumulative and per window. vLLM only
+    reports the cached prefix of a prompt, so only that is counted on the
+    simulated side too.
+    """
+    sim_hits = np.array(replay_prompt_hits(POLICIES[policy](max_size=max_size), data, prefix=True))
+    sim_rate = sim_hits.sum() / max(totals.sum(), 1)
+    vllm_rate = vllm_hits.sum() / max(totals.sum(), 1)
+    starts, sim_windows = windowed_hit_rates(sim_hits, totals, window)
+    _, vllm_windows = windowed_hit_rates(vllm_hits, totals, window)
+    return {
+        "sim_hit_rate": sim_rate,
+        "vllm_hit_rate": vllm_rate,
+        "abs_error": abs(sim_rate - vllm_rate),
+        "starts": starts,
+        "sim_windows": sim_windows,
+        "vllm_windows": vllm_windows,
+        "window_errors": np.abs(sim_windows - vllm_windows),
+    }
+
+
+def fit_cp_ratio(policy, data, base_size, vllm_hits, totals, window, lo=0.25, hi=4.0, iterations=12):
+    """
+    cp_ratio minimising the mean windowed absolute error, by golden-section
+    search on log(cp_ratio) (the error is roughly unimodal in capacity).
+    Returns (cp_ratio, mean windowed error).
+    """
+    cache = {}
+
+    def error(log_ratio):
+        if log_ratio not in cache:
+            result = fidelity(policy, data, base_size * math.exp(log_ratio), vllm_hits, totals, window)
+            cache[log_ratio] = result["window_errors"].mean()
+        return cache[log_ratio]
+
+    invphi = (math.sqrt(5) - 1) / 2
+    a, b = math.log(lo), math.log(hi)
+    c, d = b - invphi * (b - a), a + invphi * (b - a)
+    for _ in range(iterations):
+        if error(c) < error(d):
+            b, d = d, c
+            c = b - invphi * (b - a)
+        else:
+            a, c = c, d
+            d = a + invphi * (b - a)
+    best = min(cache, key=cache.get)
+    return math.exp(best), cache[best]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated policy vs hit counts measured by vLLM on the same prompts")
+    parser.add_argument("--vllm_hits", type=str, required=True, help="Measured hits per prompt, `hits [total]` per line, same order as the content-hash log")
+    parser.add_argument("--unit", type=str, default="blocks", choices=["blocks", "tokens"], help="Unit of the measured counts")
+    parser.add_argument("--policy", type=str, default="LRU", choices=list(POLICIES), help="Simulated policy matching the vLLM build")
+    parser.add_argument("--cp_ratio", type=float, default=1.0, help="Multiplier on the cache size, as in vLLM_validation.py")
+    parser.add_argument("--window", type=int, default=50, help="Prompts per error window")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Windowed absolute error that counts as a divergence")
+    parser.add_argument("--fit", action="store_true", help="Also fit cp_ratio to the measured hits")
+    add_capacity_args(parser)
+    args = parser.parse_args()
+
+    data_path = "/Users/shenyang/Desktop/MS Research/workplace/data/vLLM_valid.txt"
+    data = read_block_data_v3(data_path)[:]
+    base_size = 11170.23 / 16.0     # Qwen2.5-1.5B-Instruct
+    if args.model is not None:
+        base_size = capacity_from_args(args)
+    max_size = base_size * args.cp_ratio
+    vllm_hits, totals, mismatched = read_vllm_hits(args.vllm_hits, data, args.unit, args.block_size)
+    if mismatched:
+        print(f"warning: {mismatched} prompts have a different block count in the two logs")
+
+    result = fidelity(args.policy, data, max_size, vllm_hits, totals, args.window)
+    errors = result["window_errors"]
+    print(f"{args.policy} at max_size {max_size:.1f}: simulated {result['sim_hit_rate']:.2%}, "
+          f"vLLM {result['vllm_hit_rate']:.2%}, absolute error {result['abs_error'] * 100:.2f} pts")
+    print(f"per-window error ({args.window} prompts): mean {errors.mean() * 100:.2f} pts, "
+          f"p95 {np.percentile(errors, 95) * 100:.2f} pts, max {errors.max() * 100:.2f} pts")
+    divergences = divergence_points(result["starts"], errors, args.threshold, args.window)
+    for start, end, worst in divergences:
+        print(f"divergence: prompts {start}-{min(end, len(data)) - 1}, up to {worst * 100:.2f} pts")
+    if not divergences:
+        print(f"no window diverges by more than {args.threshold * 100:.1f} pts")
+
+    result_filename = f"./result/vllm_fidelity_{args.policy}_cp_{args.cp_ratio}.csv"
+    with open(result_filename, "w") as f:
+        f.write("window_start,sim_hitrate,vllm_hitrate,abs_error\n")
+        for start, sim, vllm, error in zip(result["starts"], result["sim_windows"], result["vllm_windows"], errors):
+            f.write(f"{start},{sim:.4f},{vllm:.4f},{error:.4f}\n")
+
+    if args.fit:
+        cp_ratio, fit_error = fit_cp_ratio(args.policy, data, base_size, vllm_hits, totals, args.window)
+        print(f"fitted cp_ratio {cp_ratio:.3f} (max_size {base_size * cp_ratio:.1f}), "
+              f"mean windowed error {fit_error * 100:.2f} pts")